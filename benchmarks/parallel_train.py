@@ -0,0 +1,32 @@
+# benchmarks/parallel_train.py
+#
+# Scaling of parallel_train() with the number of worker processes.
+# Run from the repository root:
+#     python -m benchmarks.parallel_train
+
+import multiprocessing as mp
+import time
+
+from parallel_train import parallel_train
+
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+
+
+def main(episodes=40_000, grid_size=10):
+    print(f"{episodes:,} episodes, grid {grid_size}x{grid_size}, "
+          f"{mp.cpu_count()} CPU(s)")
+    print(f"{'workers':>8}{'seconds':>10}{'episodes/sec':>15}{'speedup':>9}{'avg foods':>11}")
+    base = None
+    for workers in WORKER_COUNTS:
+        start = time.perf_counter()
+        _, totals = parallel_train(workers, episodes, 0.1, 0.9, 0.1,
+                                   grid_size=grid_size, seed=0)
+        elapsed = time.perf_counter() - start
+        rate = episodes / elapsed
+        base = base or rate
+        print(f"{workers:>8}{elapsed:>10.2f}{rate:>15,.0f}{rate / base:>8.2f}x"
+              f"{totals['foods'] / totals['episodes']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/pathfinding.py
+#
+# Planning latency per tick of the PathPlanner AI on large boards.
+# Run from the repository root:
+#     python -m benchmarks.pathfinding
+
+import random
+import time
+
+import numpy as np
+
+from pathfinding import PathPlanner
+from snake_game import SnakeGame
+
+BOARD_SIZES = [30, 100, 300]
+BUDGET = 0.5 / 60        # snake_pygame.AI_BUDGET, without importing pygame
+
+
+def play(size, ai, max_ticks, seed=0):
+    """One AI game; returns (seconds per tick array, score, ticks)."""
+    game = SnakeGame(size, size, random.Random(seed), ai)
+    clock = time.perf_counter
+    latencies = []
+    while not game.over and game.ticks < max_ticks:
+        t0 = clock()
+        game.direction = game.ai(game.snake, game.food, game.direction)
+        latencies.append(clock() - t0)
+        game.tick()
+    return np.array(latencies), game.score, game.ticks
+
+
+def main(max_ticks=20_000):
+    print(f"One game per board, at most {max_ticks:,} ticks, times in us per tick")
+    print(f"{'board':>9}{'AI':>9}{'score':>7}{'ticks':>8}"
+          f"{'mean':>9}{'p50':>8}{'p99':>9}{'max':>10}")
+    for size in BOARD_SIZES:
+        for name in ("greedy", "path", "path+cap"):
+            if name == "greedy":
+                ai = None
+            else:
+                ai = PathPlanner(size, size, BUDGET if name == "path+cap" else None)
+            latencies, score, ticks = play(size, ai, max_ticks)
+            us = latencies * 1e6
+            print(f"{f'{size}x{size}':>9}{name:>9}{score:>7}{ticks:>8}"
+                  f"{us.mean():>9.1f}{np.percentile(us, 50):>8.1f}"
+                  f"{np.percentile(us, 99):>9.1f}{us.max():>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/qtable.py
+#
+# Compare the dense QTable with the old tuple-keyed defaultdict.
+# Run from the repository root:
+#     python -m benchmarks.qtable
+
+import os
+import pickle
+import random
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from snake_env import ACTIONS
+from qtable import QTable, ACTION_INDEX, LEGACY_QTABLE_FILE as QTABLE_FILE
+
+
+def dict_nbytes(Q):
+    """Approximate memory of a {(state, action): float} dict."""
+    total = sys.getsizeof(Q)
+    seen = set()
+    for (state, action), value in Q.items():
+        total += sys.getsizeof((state, action)) + sys.getsizeof(value)
+        if id(state) not in seen:
+            seen.add(id(state))
+            total += sys.getsizeof(state) + sum(sys.getsizeof(v) for v in state)
+    return total
+
+
+def time_load(load, repeat=5):
+    """Best-of-N time to load a table and make its first greedy lookup."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load().best_action((5, 5, 2, 6))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def random_transitions(grid_size, n, seed=0):
+    rng = random.Random(seed)
+
+    def state():
+        return tuple(rng.randrange(grid_size) for _ in range(4))
+
+    return [(state(), rng.choice(ACTIONS), rng.choice([-1, 0, 1]), state())
+            for _ in range(n)]
+
+
+def bench_dict(transitions, alpha=0.1, gamma=0.9):
+    Q = defaultdict(float)
+    start = time.perf_counter()
+    for state, action, reward, next_state in transitions:
+        current_q = Q[(state, action)]
+        max_next_q = max(Q[(next_state, a)] for a in ACTIONS)
+        Q[(state, action)] = current_q + alpha * (reward + gamma * max_next_q - current_q)
+    return len(transitions) / (time.perf_counter() - start)
+
+
+def bench_qtable(transitions, grid_size, alpha=0.1, gamma=0.9):
+    Q = QTable(grid_size)
+    start = time.perf_counter()
+    for state, action, reward, next_state in transitions:
+        Q.update(state, action, reward, next_state, alpha, gamma)
+    return len(transitions) / (time.perf_counter() - start)
+
+
+def bench_qtable_batch(transitions, grid_size, batch_size=1024, alpha=0.1, gamma=0.9):
+    Q = QTable(grid_size)
+    states = Q.encode_batch([t[0] for t in transitions])
+    actions = np.array([ACTION_INDEX[t[1]] for t in transitions])
+    rewards = np.array([t[2] for t in transitions], dtype=np.float32)
+    next_states = Q.encode_batch([t[3] for t in transitions])
+    start = time.perf_counter()
+    for i in range(0, len(transitions), batch_size):
+        j = i + batch_size
+        Q.update_batch(states[i:j], actions[i:j], rewards[i:j], next_states[i:j], alpha, gamma)
+    return len(transitions) / (time.perf_counter() - start)
+
+
+def main(grid_size=10, n=500_000):
+    if os.path.exists(QTABLE_FILE):
+        with open(QTABLE_FILE, "rb") as f:
+            Q = pickle.load(f)
+        table = QTable.from_dict(Q, grid_size)
+        print(f"{QTABLE_FILE}: {len(Q):,} dict entries")
+        print(f"  dict in memory   ~{dict_nbytes(Q) / 1024:,.0f} KB")
+        print(f"  pickle on disk    {os.path.getsize(QTABLE_FILE) / 1024:,.0f} KB")
+        print(f"  QTable array      {table.values.nbytes / 1024:,.0f} KB "
+              f"(all {table.num_states:,} states)")
+
+        binary = QTABLE_FILE + ".bench.qtb"
+        table.save_binary(binary)
+        try:
+            print(f"  load pickle dict  {time_load(lambda: QTable.load_pickle(QTABLE_FILE)) * 1e3:8.2f} ms")
+            print(f"  open_binary mmap  {time_load(lambda: QTable.open_binary(binary)) * 1e3:8.2f} ms")
+        finally:
+            os.remove(binary)
+
+    transitions = random_transitions(grid_size, n)
+    print(f"\nQ-learning updates/sec ({n:,} random transitions, grid {grid_size})")
+    print(f"  defaultdict       {bench_dict(transitions):>12,.0f}")
+    print(f"  QTable.update     {bench_qtable(transitions, grid_size):>12,.0f}")
+    print(f"  QTable batch 1024 {bench_qtable_batch(transitions, grid_size):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
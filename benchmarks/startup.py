@@ -0,0 +1,67 @@
+# benchmarks/startup.py
+#
+# Start-up cost of the player entry points: wall time of a fresh
+# interpreter that loads its policy, draws the board and makes one move,
+# plus the modules it imported on the way (python -X importtime).
+# Run from the repository root:
+#     python -m benchmarks.startup
+
+import statistics
+import subprocess
+import sys
+import time
+
+PLAY = [sys.executable, "-m", "snake", "play", "--max-steps", "1", "--fps", "0"]
+
+CASES = {
+    "python -c pass": [sys.executable, "-c", "pass"],
+    "import snake": [sys.executable, "-c", "import snake"],
+    "snake play --policy qtable": PLAY + ["--policy", "qtable"],
+    "snake play --policy heuristic": PLAY + ["--policy", "heuristic"],
+    "policy.load_policy() (NumPy)": [sys.executable, "-c", "import policy; policy.load_policy()"],
+}
+
+HEAVY_MODULES = ("numpy", "pygame", "q_learning_snake")
+
+
+def wall_times(command, runs):
+    """Seconds per run of command, output discarded."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def imported_modules(command):
+    """{module: cumulative import microseconds} from python -X importtime."""
+    result = subprocess.run([command[0], "-X", "importtime"] + command[1:],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def main(runs=10):
+    print(f"Wall time of a fresh process, {runs} runs each (ms)")
+    print(f"{'command':<32}{'min':>8}{'median':>8}   heavy imports")
+    for name, command in CASES.items():
+        times = [t * 1000 for t in wall_times(command, runs)]
+        heavy = [m for m in imported_modules(command) if m in HEAVY_MODULES]
+        print(f"{name:<32}{min(times):>8.1f}{statistics.median(times):>8.1f}   "
+              f"{', '.join(heavy) or '-'}")
+
+    modules = imported_modules(CASES["snake play --policy qtable"])
+    print("\nSlowest imports of `snake play --policy qtable` (cumulative ms):")
+    for name, us in sorted(modules.items(), key=lambda item: -item[1])[:8]:
+        print(f"  {name:<28}{us / 1000:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
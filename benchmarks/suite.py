@@ -0,0 +1,331 @@
+# benchmarks/suite.py
+#
+# Benchmarks for the environment, agent and renderer hot paths.
+# Run from the repository root:
+#     python -m benchmarks --output bench.json
+#     python -m benchmarks --output new.json --compare bench.json
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from snake_env import SnakeEnv, ACTIONS
+from snake_body import SnakeBody
+from snake_game import COLS, ROWS, choose_ai_direction
+from qtable import QTable, ACTION_INDEX
+from replay_buffer import ReplayBuffer
+from vec_snake_env import VecSnakeEnv
+
+# name -> function(quick) returning seconds per operation
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def time_per_call(fn, number, repeat=3):
+    """Best-of-`repeat` seconds per call of fn() over `number` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+# ---------- board helpers ----------
+
+def board_cycle(size):
+    """
+    A cycle visiting every cell of an even-sized board once.
+
+    Row 0 left to right, then zig-zag over columns 1.. on the other rows,
+    then back up column 0. A snake following it never collides.
+    """
+    cells = [(x, 0) for x in range(size)]
+    for y in range(1, size):
+        xs = range(size - 1, 0, -1) if y % 2 == 1 else range(1, size)
+        cells.extend((x, y) for x in xs)
+    cells.extend((0, y) for y in range(size - 1, 0, -1))
+    return cells
+
+
+def move_name(a, b):
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    return {(0, -1): "UP", (0, 1): "DOWN", (-1, 0): "LEFT", (1, 0): "RIGHT"}[(dx, dy)]
+
+
+def env_with_snake(size, length):
+    """SnakeEnv whose snake lies along board_cycle(), head at index length-1."""
+    cycle = board_cycle(size)
+    env = SnakeEnv(grid_size=size)
+    env.snake = SnakeBody(size, size, reversed(cycle[:length]))
+    env._spawn_food()
+    return env, cycle
+
+
+# ---------- environment ----------
+
+def bench_env_step(size, length, quick):
+    env, cycle = env_with_snake(size, length)
+    index = {cell: i for i, cell in enumerate(cycle)}
+    moves = {cell: move_name(cell, cycle[(i + 1) % len(cycle)])
+             for i, cell in enumerate(cycle)}
+
+    def step():
+        _, _, done = env.step(moves[env.snake.head])
+        if done:
+            raise RuntimeError("snake left the cycle")
+        if len(env.snake) > length + 200 or env.snake.num_free < 2:
+            # keep the length roughly constant: rebuild behind the head
+            head = index[env.snake.head]
+            env.snake = SnakeBody(size, size, [cycle[(head - k) % len(cycle)]
+                                               for k in range(length)])
+
+    return time_per_call(step, 2_000 if quick else 20_000)
+
+
+for _size, _length in [(10, 1), (10, 50), (30, 1), (30, 400), (100, 1), (100, 5000)]:
+    benchmark(f"env_step/grid{_size}/len{_length}")(
+        lambda quick, s=_size, n=_length: bench_env_step(s, n, quick)
+    )
+
+
+def bench_env_reset(size, quick):
+    env = SnakeEnv(grid_size=size)
+    return time_per_call(env.reset, 200 if quick else 2_000)
+
+
+for _size in [10, 30, 100]:
+    benchmark(f"env_reset/grid{_size}")(lambda quick, s=_size: bench_env_reset(s, quick))
+
+
+def bench_spawn_food(size, fill, quick):
+    env, _ = env_with_snake(size, max(1, int(fill * size * size)))
+    return time_per_call(env._spawn_food, 2_000 if quick else 20_000)
+
+
+for _fill in [0.1, 0.5, 0.9, 0.99]:
+    benchmark(f"spawn_food/grid30/fill{int(_fill * 100)}")(
+        lambda quick, f=_fill: bench_spawn_food(30, f, quick)
+    )
+
+
+@benchmark("vec_env_step/grid10/n1024")
+def bench_vec_env_step(quick):
+    env = VecSnakeEnv(1024, grid_size=10, seed=0)
+    actions = np.random.default_rng(0).integers(0, len(ACTIONS), size=1024)
+    # per game step
+    return time_per_call(lambda: env.step(actions), 20 if quick else 200) / 1024
+
+
+# ---------- agent ----------
+
+def _transitions(n, size=10, seed=0):
+    rng = random.Random(seed)
+
+    def state():
+        return tuple(rng.randrange(size) for _ in range(4))
+
+    return [(state(), rng.choice(ACTIONS), rng.choice([-1, 0, 1]), state())
+            for _ in range(n)]
+
+
+@benchmark("q_update/scalar")
+def bench_q_update(quick):
+    Q = QTable(10)
+    transitions = _transitions(10_000)
+    it = iter(range(10 ** 9))
+
+    def update():
+        t = transitions[next(it) % len(transitions)]
+        Q.update(t[0], t[1], t[2], t[3], 0.1, 0.9)
+
+    return time_per_call(update, 10_000 if quick else 100_000)
+
+
+@benchmark("q_update/batch1024")
+def bench_q_update_batch(quick):
+    Q = QTable(10)
+    transitions = _transitions(1024)
+    states = Q.encode_batch([t[0] for t in transitions])
+    actions = np.array([ACTION_INDEX[t[1]] for t in transitions])
+    rewards = np.array([t[2] for t in transitions], dtype=np.float32)
+    next_states = Q.encode_batch([t[3] for t in transitions])
+    # per transition
+    return time_per_call(
+        lambda: Q.update_batch(states, actions, rewards, next_states, 0.1, 0.9),
+        20 if quick else 200,
+    ) / len(transitions)
+
+
+@benchmark("replay/append")
+def bench_replay_append(quick):
+    buffer = ReplayBuffer(10_000, seed=0)
+    return time_per_call(lambda: buffer.append(123, 2, 0.1, 456, False),
+                         10_000 if quick else 100_000)
+
+
+@benchmark("replay/sample32_update")
+def bench_replay_update(quick):
+    Q = QTable(10)
+    buffer = ReplayBuffer(10_000, seed=0)
+    rng = random.Random(0)
+    for _ in range(buffer.capacity):
+        buffer.append(rng.randrange(Q.num_states), rng.randrange(len(ACTIONS)),
+                      rng.choice([-1.0, 0.1, 1.0]), rng.randrange(Q.num_states),
+                      rng.random() < 0.05)
+
+    def update():
+        states, actions, rewards, next_states, dones = buffer.sample(32)
+        Q.update_batch(states, actions, rewards, next_states, 0.1, 0.9, dones)
+
+    # per minibatch
+    return time_per_call(update, 200 if quick else 2_000)
+
+
+# ---------- pygame game ----------
+
+def _pygame():
+    """Import snake_pygame with the SDL dummy drivers (no window, no sound)."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import snake_pygame
+    return snake_pygame
+
+
+def _board_snake(length):
+    """A snake of `length` segments on the pygame game's board."""
+    cycle = board_cycle(COLS)
+    return SnakeBody(COLS, ROWS, reversed(cycle[:length]))
+
+
+for _length in [3, 100, 800]:
+    @benchmark(f"ai_direction/len{_length}")
+    def bench_ai_direction(quick, length=_length):
+        snake = _board_snake(length)
+        food = snake.random_free_cell()
+        return time_per_call(lambda: choose_ai_direction(snake, food, [1, 0]),
+                             2_000 if quick else 20_000)
+
+    @benchmark(f"pygame_frame/len{_length}")
+    def bench_pygame_frame(quick, length=_length):
+        sp = _pygame()
+        import pygame
+        pygame.init()
+        screen = pygame.display.set_mode((sp.WIDTH, sp.HEIGHT))
+        snake = _board_snake(length)
+        food = snake.random_free_cell()
+
+        def frame():
+            screen.fill(sp.BLACK)
+            sp.draw_playfield(screen, snake, food, 12, 56, "AI")
+            pygame.display.flip()
+
+        return time_per_call(frame, 20 if quick else 200)
+
+    @benchmark(f"pygame_frame_dirty/len{_length}")
+    def bench_pygame_frame_dirty(quick, length=_length):
+        sp = _pygame()
+        import pygame
+        pygame.init()
+        screen = pygame.display.set_mode((sp.WIDTH, sp.HEIGHT))
+        cycle = board_cycle(sp.COLS)
+        snake = SnakeBody(sp.COLS, sp.ROWS, reversed(cycle[:length]))
+        food = [snake.random_free_cell()]
+        renderer = sp.DirtyRenderer(screen)
+        position = [length - 1]
+
+        def frame():
+            # one tick along the cycle (food moves instead of the snake
+            # growing, to keep the length fixed), then an incremental redraw
+            position[0] = (position[0] + 1) % len(cycle)
+            snake.push_head(cycle[position[0]])
+            snake.pop_tail()
+            if snake.head == food[0]:
+                food[0] = snake.random_free_cell()
+            renderer.draw(snake, food[0], 12, 56, "AI")
+
+        return time_per_call(frame, 50 if quick else 500)
+
+
+# ---------- runner ----------
+
+def run(names, quick=False):
+    results = {}
+    for name in names:
+        seconds = BENCHMARKS[name](quick)
+        results[name] = {"us_per_op": seconds * 1e6, "ops_per_sec": 1.0 / seconds}
+        print(f"{name:<32}{seconds * 1e6:>12.3f} us{1.0 / seconds:>16,.0f} /s", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline run; return names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<32}{'baseline us':>14}{'now us':>12}{'change':>9}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]["us_per_op"]
+        new = result["us_per_op"]
+        change = (new - old) / old
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<32}{old:>14.3f}{new:>12.3f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snake performance benchmarks.")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="compare against an earlier JSON results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown (fraction) reported as a regression")
+    parser.add_argument("--filter", default="", help="only run benchmarks containing this")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument("--list", action="store_true", help="list benchmark names")
+    args = parser.parse_args()
+
+    names = [n for n in BENCHMARKS if args.filter in n]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    results = run(names, quick=args.quick)
+
+    if args.output:
+        report = {
+            "meta": {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": sys.version.split()[0],
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "quick": args.quick,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
@@ -0,0 +1,50 @@
+# benchmarks/vec_env.py
+#
+# Run from the repository root:
+#     python -m benchmarks.vec_env
+
+import random
+import time
+
+import numpy as np
+
+from snake_env import SnakeEnv, ACTIONS
+from vec_snake_env import VecSnakeEnv
+
+BATCH_SIZES = [1, 64, 1024, 16384]
+
+
+def bench_single_env(grid_size, steps):
+    """Steps/sec of the plain SnakeEnv with random actions."""
+    env = SnakeEnv(grid_size=grid_size)
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, done = env.step(random.choice(ACTIONS))
+        if done:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def bench_vec_env(num_envs, grid_size, batch_steps):
+    """Game steps/sec of VecSnakeEnv (num_envs game steps per call)."""
+    env = VecSnakeEnv(num_envs, grid_size=grid_size, seed=0)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, len(ACTIONS), size=(batch_steps, num_envs))
+    start = time.perf_counter()
+    for t in range(batch_steps):
+        env.step(actions[t])
+    return num_envs * batch_steps / (time.perf_counter() - start)
+
+
+def main(grid_size=10, total_steps=2_000_000):
+    print(f"Grid {grid_size}x{grid_size}, random actions")
+    print(f"{'env':<22}{'steps/sec':>14}")
+    print(f"{'SnakeEnv':<22}{bench_single_env(grid_size, 200_000):>14,.0f}")
+    for n in BATCH_SIZES:
+        batch_steps = max(50, min(20_000, total_steps // n))
+        rate = bench_vec_env(n, grid_size, batch_steps)
+        print(f"{f'VecSnakeEnv N={n}':<22}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# checkpoint.py
+#
+# Periodic Q-table checkpoints for long training runs.
+#
+# A checkpoint directory holds at most two files:
+#   full.npz   -- the whole Q-table plus run state at some episode
+#   delta.npz  -- every row that changed since full.npz was written, plus
+#                 the run state at a later episode
+# Each delta replaces the previous one, so restoring never reads more than
+# these two files. Files are plain .npz archives (no pickles); the run
+# state is a JSON document stored as a byte array, and any extra arrays
+# saved with it (like a replay buffer) are stored whole in each file.
+
+import json
+import os
+import queue
+import threading
+import uuid
+
+import numpy as np
+
+from qtable import qtable_class
+
+FULL_FILE = "full.npz"
+DELTA_FILE = "delta.npz"
+EXTRA_PREFIX = "extra_"
+
+
+def _pack_meta(meta):
+    return np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack_meta(array):
+    return json.loads(array.tobytes().decode("utf-8"))
+
+
+def write_atomic(path, arrays):
+    """Write an .npz file so that `path` is always either old or complete."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    # the rename itself is only durable once the directory is synced
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def _fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # directories can't be opened here (Windows)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Checkpointer:
+    """
+    Writes full and delta checkpoints of a Q-table from a background thread.
+
+    The only work save() does on the training thread is copying the table.
+    A worker thread compares the copy with the last full snapshot, then
+    writes either the changed rows (a delta) or the whole table to a temp
+    file and renames it over the old one, while training carries on.
+
+    A new full snapshot is taken instead of a delta (compaction) when more
+    than `compact_fraction` of the rows have changed, or after `max_deltas`
+    deltas in a row.
+
+    At most one checkpoint waits while another is written; a newer save()
+    replaces it, so a slow disk never piles up table copies. Every delta is
+    relative to the full snapshot, so a skipped checkpoint loses nothing.
+    """
+
+    def __init__(self, directory, every=1000, compact_fraction=0.25, max_deltas=20):
+        self.directory = directory
+        self.every = every
+        self.compact_fraction = compact_fraction
+        self.max_deltas = max_deltas
+        os.makedirs(directory, exist_ok=True)
+
+        # owned by the worker thread
+        self._base = None         # Q values as of the last full snapshot
+        self._snapshot = None     # id of the last full snapshot
+        self._deltas = 0          # deltas written since then
+
+        self._error = None
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def due(self, episode):
+        """True if a checkpoint should be saved after `episode` (a multiple of `every`)."""
+        return bool(self.every) and episode % self.every == 0
+
+    def save(self, Q, episode, state, arrays=None):
+        """
+        Queue a checkpoint of Q after `episode` episodes.
+
+        state: JSON-serialisable dict restored as-is by load_checkpoint()
+        arrays: optional {name: array} saved (copied) with the checkpoint and
+                restored as state["arrays"]
+        """
+        if self._error is not None:
+            raise self._error
+        meta = {"grid_size": Q.grid_size, "episode": episode, "state": state}
+        extra = {EXTRA_PREFIX + name: np.array(a) for name, a in (arrays or {}).items()}
+        item = (np.array(Q.values), meta, extra)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+            try:
+                self._queue.get_nowait()    # drop the older waiting checkpoint
+                self._queue.task_done()
+            except queue.Empty:
+                pass                        # the writer just took it
+
+    def _write(self, values, meta, extra):
+        changed = None
+        if self._base is not None and self._deltas < self.max_deltas:
+            changed = np.flatnonzero((values != self._base).any(axis=1))
+            if len(changed) > self.compact_fraction * len(values):
+                changed = None
+
+        if changed is None:
+            self._snapshot = meta["snapshot"] = uuid.uuid4().hex
+            write_atomic(os.path.join(self.directory, FULL_FILE),
+                         {"values": values, "meta": _pack_meta(meta), **extra})
+            self._base = values
+            self._deltas = 0
+            # the old delta is relative to the previous snapshot
+            delta = os.path.join(self.directory, DELTA_FILE)
+            if os.path.exists(delta):
+                os.remove(delta)
+        else:
+            meta["base"] = self._snapshot
+            write_atomic(os.path.join(self.directory, DELTA_FILE),
+                         {"rows": changed, "values": values[changed],
+                          "meta": _pack_meta(meta), **extra})
+            self._deltas += 1
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:
+                    self._write(*item)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Wait until every queued checkpoint is on disk."""
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+def load_checkpoint(directory):
+    """
+    Restore the latest checkpoint in directory.
+
+    returns: (Q, episode, state), or None if there is no checkpoint; arrays
+             given to save() are in state["arrays"]
+    """
+    full_path = os.path.join(directory, FULL_FILE)
+    if not os.path.exists(full_path):
+        return None
+    with np.load(full_path, allow_pickle=False) as data:
+        meta = _unpack_meta(data["meta"])
+        Q = qtable_class(meta["grid_size"])(meta["grid_size"], values=data["values"])
+        extra = _extra_arrays(data)
+
+    delta_path = os.path.join(directory, DELTA_FILE)
+    if os.path.exists(delta_path):
+        with np.load(delta_path, allow_pickle=False) as data:
+            delta_meta = _unpack_meta(data["meta"])
+            # a delta left over from an older snapshot is ignored
+            if delta_meta["base"] == meta["snapshot"]:
+                Q.values[data["rows"]] = data["values"]
+                meta = delta_meta
+                extra = _extra_arrays(data)
+    state = meta["state"]
+    if extra:
+        state["arrays"] = extra
+    return Q, meta["episode"], state
+
+
+def _extra_arrays(data):
+    return {key[len(EXTRA_PREFIX):]: data[key] for key in data.files
+            if key.startswith(EXTRA_PREFIX)}
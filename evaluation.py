@@ -0,0 +1,284 @@
+# evaluation.py
+#
+# Evaluate a Snake policy over many episodes in parallel and report the mean
+# foods, steps and reward per episode with bootstrap confidence intervals.
+#
+# Policies are given by name so that every worker process can build its own:
+#   random               uniformly random actions
+#   heuristic            snake_game.choose_ai_direction (greedy, avoids walls)
+#   qtable[:PATH]        greedy policy of a Q-table (.qtb / .pkl) or a
+#                        compiled policy (.qpol); without PATH, load_policy()
+
+import argparse
+import multiprocessing as mp
+import random
+import time
+
+import numpy as np
+
+from snake_env import SnakeEnv, ACTIONS
+from snake_game import choose_env_action
+from policy import GreedyPolicy, compile_policy, load_policy
+from qtable import load_qtable, ACTION_INDEX
+from seeding import worker_seeds
+from trajectory import TrajectoryWriter, pack_actions, outcome_of
+
+FIELDS = ("foods", "steps", "reward")
+CHUNK_EPISODES = 250          # episodes per task handed to a worker
+BOOTSTRAP_SAMPLES = 2000
+
+
+# ---------- Policies ----------
+
+class RandomPolicy:
+    state_encoding = "absolute"
+
+    def __call__(self, env, state):
+        return random.choice(ACTIONS)
+
+
+class HeuristicPolicy:
+    """choose_ai_direction() from the pygame game, played in SnakeEnv."""
+
+    state_encoding = "absolute"
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def __call__(self, env, state):
+        return choose_env_action(env, self.rng)
+
+
+class QTablePolicy:
+    """Greedy action of a compiled policy (absolute or relative states)."""
+
+    def __init__(self, path=None, grid_size=None):
+        if path is None:
+            self.policy = load_policy()
+        elif path.endswith(".qpol"):
+            self.policy = GreedyPolicy.load(path)
+        else:
+            self.policy = compile_policy(load_qtable(path))
+        self.state_encoding = self.policy.state_encoding
+        if self.policy.grid_size and grid_size and self.policy.grid_size != grid_size:
+            g = self.policy.grid_size
+            raise ValueError(f"Policy was compiled for a {g}x{g} grid, "
+                             f"not {grid_size}x{grid_size}")
+
+    def __call__(self, env, state):
+        return self.policy.action(state)
+
+
+POLICIES = {
+    "random": lambda arg, grid_size, seed: RandomPolicy(),
+    "heuristic": lambda arg, grid_size, seed: HeuristicPolicy(seed),
+    "qtable": lambda arg, grid_size, seed: QTablePolicy(arg, grid_size),
+}
+
+
+def make_policy(spec, grid_size=None, seed=None):
+    """
+    Build a policy from a "name" or "name:argument" string.
+
+    A policy is a callable (env, state) -> action name with a
+    `state_encoding` attribute for the SnakeEnv it plays in.
+    """
+    name, _, arg = spec.partition(":")
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy {name!r}; choose from {', '.join(POLICIES)}")
+    return POLICIES[name](arg or None, grid_size, seed)
+
+
+# ---------- Workers ----------
+
+def run_episodes(spec, episodes, grid_size, max_steps, seed, record=False):
+    """
+    Play `episodes` episodes of one policy from one seed (no learning).
+
+    returns: see play_episodes()
+    """
+    random.seed(seed)
+    policy = make_policy(spec, grid_size, seed)
+    env = SnakeEnv(grid_size=grid_size, state_encoding=policy.state_encoding,
+                   seed=random.getrandbits(64))
+    return play_episodes(policy, env, episodes, max_steps, record)
+
+
+def play_episodes(policy, env, episodes, max_steps, record=False):
+    """
+    Play `episodes` episodes in env with policy(env, state) -> action,
+    using whatever RNG state the caller has set up.
+
+    returns: dict of per-episode arrays, one per FIELDS entry. With record,
+             also "trajectories": (episode seed, packed actions, outcome)
+             per episode, for a trajectory.TrajectoryWriter
+    """
+    foods = np.zeros(episodes, dtype=np.int32)
+    steps = np.zeros(episodes, dtype=np.int32)
+    rewards = np.zeros(episodes, dtype=np.float32)
+    trajectories = []
+    taken = bytearray()
+    for episode in range(episodes):
+        # seeded episodes, so that a recorded one can be replayed; the
+        # results are the same with or without record
+        state = env.reset(seed=env.seeds.getrandbits(63))
+        total_reward = 0
+        eaten = 0
+        step = 0
+        while step < max_steps and not env.done:
+            action = policy(env, state)
+            if record:
+                taken.append(ACTION_INDEX[action])
+            state, reward, _ = env.step(action)
+            total_reward += reward
+            if reward >= 1:
+                eaten += 1
+            step += 1
+        foods[episode] = eaten
+        steps[episode] = step
+        rewards[episode] = total_reward
+        if record:
+            trajectories.append((env.episode_seed, pack_actions(taken), outcome_of(env)))
+            taken.clear()
+    results = {"foods": foods, "steps": steps, "reward": rewards}
+    if record:
+        results["trajectories"] = trajectories
+    return results
+
+
+def _run_chunk(task):
+    index, args = task
+    return index, run_episodes(*args)
+
+
+# ---------- Statistics ----------
+
+def bootstrap_ci(values, confidence=0.95, samples=BOOTSTRAP_SAMPLES, seed=None):
+    """
+    Percentile bootstrap confidence interval for the mean of `values`.
+
+    Resamples are drawn in blocks so memory stays bounded for large runs.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n < 2:
+        mean = float(values.mean()) if n else 0.0
+        return mean, mean
+    rng = np.random.default_rng(seed)
+    means = np.empty(samples)
+    block = max(1, min(samples, (1 << 22) // n))
+    for start in range(0, samples, block):
+        stop = min(samples, start + block)
+        idx = rng.integers(0, n, size=(stop - start, n))
+        means[start:stop] = values[idx].mean(axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(means, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+# ---------- Harness ----------
+
+def evaluate(policy, episodes, grid_size=10, workers=None, seed=None, max_steps=200,
+             confidence=0.95, chunk_episodes=CHUNK_EPISODES, record=None):
+    """
+    Evaluate `policy` (a name, see POLICIES) over `episodes` episodes.
+
+    Episodes are split into chunks of `chunk_episodes`, each with its own
+    seed spawned from `seed`, and the chunks are spread over a pool of
+    `workers` processes (default: one per CPU; 1 runs in this process).
+    Because the seeds belong to chunks rather than workers, the result is
+    the same for any number of workers.
+
+    record: trajectory store directory to append every episode to (in the
+            order the chunks finish), labelled with the policy spec
+
+    returns: dict with "policy", "episodes", "seconds" and, per field in
+             FIELDS, {"mean", "std", "low", "high"}
+    """
+    make_policy(policy, grid_size)   # fail early on a bad spec or missing file
+    workers = workers or mp.cpu_count()
+    counts = [min(chunk_episodes, episodes - start)
+              for start in range(0, episodes, chunk_episodes)]
+    seeds = worker_seeds(seed, len(counts))
+    tasks = [(i, (policy, n, grid_size, max_steps, seeds[i], record is not None))
+             for i, n in enumerate(counts)]
+
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    results = {
+        "foods": np.zeros(episodes, dtype=np.int32),
+        "steps": np.zeros(episodes, dtype=np.int32),
+        "reward": np.zeros(episodes, dtype=np.float32),
+    }
+
+    writer = TrajectoryWriter(record, policy=policy) if record is not None else None
+    start = time.perf_counter()
+    if workers == 1 or len(tasks) <= 1:
+        chunks = map(_run_chunk, tasks)
+        pool = None
+    else:
+        pool = mp.Pool(min(workers, len(tasks)))
+        chunks = pool.imap_unordered(_run_chunk, tasks)
+    try:
+        for index, chunk in chunks:
+            for field in FIELDS:
+                results[field][offsets[index]:offsets[index + 1]] = chunk[field]
+            if writer is not None:
+                for k, (episode_seed, packed, outcome) in enumerate(chunk["trajectories"]):
+                    writer.append_packed(episode_seed, grid_size, packed, chunk["steps"][k],
+                                         chunk["foods"][k], chunk["reward"][k], outcome)
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+
+    report = {"policy": policy, "episodes": episodes, "seconds": elapsed}
+    for field in FIELDS:
+        values = results[field]
+        low, high = bootstrap_ci(values, confidence, seed=seed)
+        report[field] = {
+            "mean": float(values.mean()) if episodes else 0.0,
+            "std": float(values.std(ddof=1)) if episodes > 1 else 0.0,
+            "low": low,
+            "high": high,
+        }
+    return report
+
+
+def print_report(report, confidence=0.95):
+    print(f"=== {report['policy']} ({report['episodes']:,} episodes, "
+          f"{report['seconds']:.1f}s) ===")
+    for field in FIELDS:
+        r = report[field]
+        print(f"  {field:<7} {r['mean']:8.3f}   {confidence:.0%} CI "
+              f"[{r['low']:.3f}, {r['high']:.3f}]   std {r['std']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Evaluate Snake policies in parallel with bootstrap confidence intervals."
+    )
+    parser.add_argument("policies", nargs="*", default=["random", "heuristic", "qtable"],
+                        help="random, heuristic or qtable[:PATH] (default: all three)")
+    parser.add_argument("--episodes", type=int, default=10000)
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--max-steps", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=mp.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--record", metavar="DIR",
+                        help="append every episode to this trajectory store")
+    args = parser.parse_args()
+
+    for spec in args.policies:
+        report = evaluate(spec, args.episodes, grid_size=args.grid_size,
+                          workers=args.workers, seed=args.seed,
+                          max_steps=args.max_steps, confidence=args.confidence,
+                          record=args.record)
+        print_report(report, args.confidence)
+
+
+if __name__ == "__main__":
+    main()
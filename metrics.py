@@ -0,0 +1,223 @@
+# metrics.py
+#
+# Streaming statistics for training and evaluation runs. Everything here
+# uses a fixed amount of memory no matter how many episodes are recorded.
+
+import csv
+import math
+import os
+
+import numpy as np
+
+
+class RunningStats:
+    """Count, total, mean, variance (Welford), min and max of a stream."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.count += 1
+        self.total += x
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    @property
+    def variance(self):
+        """Sample variance (0 for fewer than two values)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class MovingAverage:
+    """
+    Mean of the last `window` values, kept in a ring buffer.
+
+    The running sum is recomputed from the buffer each time the ring wraps
+    around, so floating-point drift can't build up over long runs.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = np.zeros(window, dtype=np.float64)
+        self.position = 0
+        self.size = 0
+        self._sum = 0.0
+
+    def add(self, x):
+        i = self.position
+        self._sum += x - self.values[i]
+        self.values[i] = x
+        self.position = (i + 1) % self.window
+        if self.size < self.window:
+            self.size += 1
+        if self.position == 0:
+            self._sum = float(self.values.sum())
+
+    @property
+    def mean(self):
+        return self._sum / self.size if self.size else 0.0
+
+
+class P2Quantile:
+    """
+    Streaming estimate of the p-th quantile with the P-square algorithm
+    (Jain & Chlamtac, 1985): five markers, O(1) memory and time per value.
+    Exact for the first five values.
+    """
+
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        self.count += 1
+        q = self.heights
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        # find the cell x falls into, extending the extremes if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # move the middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self):
+        if not self.heights:
+            return 0.0
+        if self.count <= 5:
+            return self.heights[round(self.p * (len(self.heights) - 1))]
+        return self.heights[2]
+
+
+class MetricsLog:
+    """
+    Append-only CSV log of one row per record, written in batches.
+
+    Rows are buffered and written every `flush_every` records (and on
+    close), so logging every episode costs one list append most of the
+    time. A header is written only when the file is new.
+    """
+
+    def __init__(self, path, fields, flush_every=1000):
+        self.fields = list(fields)
+        self.flush_every = flush_every
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", newline="")
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(self.fields)
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.writerows(self.rows)
+            self.rows.clear()
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+
+class EpisodeMetrics:
+    """
+    Per-episode metrics for a training or evaluation run.
+
+    For every field it keeps RunningStats (`stats`), a MovingAverage over
+    the last `window` episodes (`recent`) and P2Quantile estimates for
+    each of `quantiles` (`quantiles[field][p]`). With log_path, every
+    episode is also appended to a CSV file (episode number first).
+
+    `episodes` is the number of the last episode added. A resumed run
+    passes start (the episodes already run) so numbering carries on from
+    there; the statistics only cover episodes added to this object.
+    """
+
+    def __init__(self, fields=("reward", "foods", "steps"), window=100,
+                 quantiles=(0.5, 0.9, 0.99), log_path=None, flush_every=1000, start=0):
+        self.fields = tuple(fields)
+        self.start = start
+        self.episodes = start
+        self.stats = {f: RunningStats() for f in self.fields}
+        self.recent = {f: MovingAverage(window) for f in self.fields}
+        self.quantiles = {f: {p: P2Quantile(p) for p in quantiles} for f in self.fields}
+        self.log = None
+        if log_path:
+            self.log = MetricsLog(log_path, ("episode",) + self.fields, flush_every)
+
+    def add(self, *values):
+        """Record one episode; values are given in `fields` order."""
+        self.episodes += 1
+        for field, value in zip(self.fields, values):
+            self.stats[field].add(value)
+            self.recent[field].add(value)
+            for estimator in self.quantiles[field].values():
+                estimator.add(value)
+        if self.log is not None:
+            self.log.write((self.episodes,) + values)
+
+    def quantile(self, field, p):
+        return self.quantiles[field][p].value
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
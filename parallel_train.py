@@ -0,0 +1,166 @@
+# parallel_train.py
+
+import argparse
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from snake_env import SnakeEnv, ACTIONS
+from qtable import QTable, QTABLE_FILE
+from seeding import worker_seeds
+import q_learning_snake as ql
+
+RESULT_POLL_SECONDS = 0.5      # how often to check for dead workers while waiting
+
+
+def _attach_qtable(shm, grid_size):
+    """QTable whose values live in the shared memory block."""
+    shape = (grid_size ** 4, len(ACTIONS))
+    values = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+    return QTable(grid_size, values=values)
+
+
+def _close(shm):
+    """
+    Close shm. Views of it may still be alive in the frames of an exception
+    being raised; close() then raises BufferError, which would replace that
+    exception, so the block is left to be unmapped when the process exits.
+    """
+    try:
+        shm.close()
+    except BufferError:
+        pass
+
+
+def _worker(shm_name, grid_size, episodes, alpha, gamma, epsilon, seed, max_steps, results):
+    """Train on the shared Q-table without locks (Hogwild-style)."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    Q = None
+    try:
+        Q = _attach_qtable(shm, grid_size)
+        env = SnakeEnv(grid_size=grid_size)
+        _, metrics = ql.train(env, episodes, alpha, gamma, epsilon,
+                              seed=seed, max_steps=max_steps, Q=Q)
+        stats = metrics.stats
+        results.put((stats["reward"].total, stats["foods"].total,
+                     stats["steps"].total, metrics.episodes))
+    finally:
+        Q = None
+        _close(shm)
+
+
+def _next_result(results, procs):
+    """
+    The next worker result. A worker that dies without sending one (an
+    exception, or killed) would otherwise leave results.get() waiting
+    forever, so the workers' exit codes are checked while waiting.
+    """
+    while True:
+        try:
+            return results.get(timeout=RESULT_POLL_SECONDS)
+        except queue.Empty:
+            failed = [p for p in procs if p.exitcode not in (None, 0)]
+            if failed:
+                raise RuntimeError(f"Worker {failed[0].pid} exited with code "
+                                   f"{failed[0].exitcode}")
+
+
+def parallel_train(workers, episodes, alpha, gamma, epsilon, grid_size=10,
+                   seed=None, max_steps=ql.max_steps_per_episode):
+    """
+    Train one Q-table with several processes at once.
+
+    The table is kept in multiprocessing.shared_memory and every worker runs
+    its own SnakeEnv and updates the shared table in place, without locks.
+    Episodes are split evenly between the workers and each worker gets its
+    own seed derived from `seed`.
+
+    returns: (Q, totals) where Q is a normal in-memory QTable and totals
+             has the summed "rewards", "foods", "steps" and "episodes"
+    """
+    shape = (grid_size ** 4, len(ACTIONS))
+    nbytes = int(np.prod(shape)) * np.dtype(np.float32).itemsize
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    shared = None
+    try:
+        shared = _attach_qtable(shm, grid_size)
+        shared.values[:] = 0.0
+
+        results = mp.Queue()
+        seeds = worker_seeds(seed, workers)
+        share, extra = divmod(episodes, workers)
+        procs = []
+        for k in range(workers):
+            n = share + (1 if k < extra else 0)
+            p = mp.Process(target=_worker, args=(
+                shm.name, grid_size, n, alpha, gamma, epsilon, seeds[k], max_steps, results,
+            ))
+            p.start()
+            procs.append(p)
+
+        totals = {"rewards": 0.0, "foods": 0, "steps": 0, "episodes": 0}
+        try:
+            for _ in procs:
+                rewards, foods, steps, n = _next_result(results, procs)
+                totals["rewards"] += rewards
+                totals["foods"] += foods
+                totals["steps"] += steps
+                totals["episodes"] += n
+        except BaseException:
+            # don't leave the other workers training on a table that is
+            # about to be unlinked
+            for p in procs:
+                p.terminate()
+            raise
+        finally:
+            for p in procs:
+                p.join()
+        for p in procs:
+            if p.exitcode != 0:
+                raise RuntimeError(f"Worker {p.pid} exited with code {p.exitcode}")
+
+        Q = QTable(grid_size, values=shared.values.copy())
+    finally:
+        shared = None
+        _close(shm)
+        shm.unlink()
+    return Q, totals
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train a Q-learning Snake agent with several processes."
+    )
+    parser.add_argument("--workers", type=int, default=mp.cpu_count())
+    parser.add_argument("--episodes", type=int, default=ql.num_episodes)
+    parser.add_argument("--alpha", type=float, default=ql.alpha)
+    parser.add_argument("--gamma", type=float, default=ql.gamma)
+    parser.add_argument("--epsilon", type=float, default=ql.epsilon)
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--max-steps", type=int, default=ql.max_steps_per_episode)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=QTABLE_FILE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    Q, totals = parallel_train(
+        args.workers, args.episodes, args.alpha, args.gamma, args.epsilon,
+        grid_size=args.grid_size, seed=args.seed, max_steps=args.max_steps,
+    )
+    elapsed = time.perf_counter() - start
+    Q.save(args.output)
+
+    episodes = totals["episodes"]
+    print(f"=== PARALLEL TRAINING ({args.workers} workers) ===")
+    print(f"Episodes: {episodes} in {elapsed:.1f}s ({episodes / elapsed:,.0f} episodes/sec)")
+    print(f"Average reward: {totals['rewards'] / episodes:.2f}")
+    print(f"Average foods eaten: {totals['foods'] / episodes:.2f}")
+    print(f"Average steps survived: {totals['steps'] / episodes:.2f}")
+    print(f"Q-table saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# pathfinding.py
+#
+# BFS path planner for the pygame Snake AI. Drop-in replacement for
+# snake_game.choose_ai_direction that looks further than one step ahead.
+
+import time
+from itertools import islice
+
+import numpy as np
+
+from snake_game import choose_ai_direction
+
+# (dx, dy) moves, in the same order as choose_ai_direction's candidates
+MOVES = [[0, -1], [0, 1], [-1, 0], [1, 0]]
+
+FREE, BLOCKED, VISITED = 0, 1, 2
+
+
+class _OutOfTime(Exception):
+    """A replan ran past the planner's budget."""
+
+
+class PathPlanner:
+    """
+    Plans a shortest path to the food and follows it tick by tick.
+
+    The board is searched in the padded layout of SnakeBody.grid (a blocked
+    border around it), so a neighbour is always index +-1 or +-width and no
+    bounds checks are needed. The snake keeps that grid up to date itself,
+    in O(1) as the head and tail move, so the planner never rebuilds it: a
+    search starts from a copy of it in a preallocated board, marks cells
+    VISITED there as it reaches them, and a hypothetical body (the snake
+    after eating) is searched by editing only the cells that differ.
+
+    A search allocates nothing: cells are appended to one preallocated queue
+    (each BFS layer is a slice of it) and every intermediate array of a
+    layer is written into scratch buffers. Each reached cell records the
+    move that reached it, which is also how a cell reached from two parents
+    in one layer is kept once.
+
+    A path to the food is only taken if, after eating, the snake could
+    still reach its own tail; otherwise the planner follows a path towards
+    the tail instead (see _stall). Either path is cached and only replanned
+    when it runs out, the food moves, the snake is no longer where the path
+    expects it, or the next cell is blocked.
+
+    budget: seconds a replan may take (None = no limit). A search checks
+            the clock once per BFS layer; a replan that runs over is
+            dropped and that tick falls back to choose_ai_direction, so on
+            huge boards a tick stays within a frame. Without a budget the
+            planner is deterministic.
+    """
+
+    def __init__(self, cols, rows, budget=None):
+        self.cols = cols
+        self.rows = rows
+        self.budget = budget
+        self._deadline = None
+        self.width = cols + 2
+        self.size = size = self.width * (rows + 2)
+
+        self._grid = None        # the SnakeBody.grid that _snake_grid views
+        self._snake_grid = None
+        self._board = np.zeros(size, dtype=np.uint8)   # FREE / BLOCKED / VISITED
+        self._move = np.zeros(size, dtype=np.int8)     # MOVES index that reached a cell
+        self._queue = np.zeros(size, dtype=np.int32)
+
+        # scratch space for one layer: up to 4 candidates per queued cell
+        self._neighbours = np.zeros(4 * size, dtype=np.int32)
+        self._moves = np.tile(np.arange(4, dtype=np.int8), size)
+        self._cells = np.zeros(4 * size, dtype=np.uint8)
+        self._mask = np.zeros(4 * size, dtype=bool)
+        self._candidates = np.zeros(4 * size, dtype=np.int32)
+        self._candidate_moves = np.zeros(4 * size, dtype=np.int8)
+        self._recorded = np.zeros(4 * size, dtype=np.int8)
+
+        self._offset_list = [-self.width, self.width, -1, 1]
+        self._offsets = np.array(self._offset_list, dtype=np.int32)
+
+        self._path = []      # cells still to visit, next one last
+        self._food = None
+
+    # ---------- cells <-> flat indices ----------
+
+    def index(self, cell):
+        return (cell[1] + 1) * self.width + cell[0] + 1
+
+    def cell(self, index):
+        y, x = divmod(int(index), self.width)
+        return (x - 1, y - 1)
+
+    def _attach(self, snake):
+        """View snake.grid (1 = wall or body) as the board to search."""
+        if snake.grid is not self._grid:
+            if len(snake.grid) != self.size:
+                raise ValueError(f"Snake is not on a {self.cols}x{self.rows} board")
+            self._grid = snake.grid
+            self._snake_grid = np.frombuffer(snake.grid, dtype=np.uint8)
+
+    def _reset(self):
+        """Start the next search from the snake's current grid."""
+        np.copyto(self._board, self._snake_grid)
+
+    # ---------- search ----------
+
+    def _search(self, start, target=-1, goals=None):
+        """
+        BFS from flat index `start` over FREE cells of the board set up by
+        _reset().
+
+        target (if >= 0) counts as free and ends the search once reached.
+        goals: {index: None} -- filled in with the number of layers at which
+               each one was reached; the search ends once all have been
+        returns: (found, layers, visited) -- layers is the path length to
+                 the target if found
+        """
+        board, move, queue = self._board, self._move, self._queue
+        if target >= 0:
+            board[target] = FREE
+        pending = [index for index in goals if board[index] == FREE] if goals else []
+
+        board[start] = VISITED
+        move[start] = -1
+        queue[0] = start
+        low, high = 0, 1
+        layers = 0
+        found = False
+        deadline = self._deadline
+        while low < high:
+            if deadline is not None and time.perf_counter() > deadline:
+                raise _OutOfTime
+            n = 4 * (high - low)
+            neighbours = self._neighbours[:n]
+            np.add(queue[low:high, None], self._offsets, out=neighbours.reshape(-1, 4))
+            free = np.equal(np.take(board, neighbours, out=self._cells[:n], mode="clip"),
+                            FREE, out=self._mask[:n])
+            count = np.count_nonzero(free)
+            if not count:
+                break
+            candidates = np.compress(free, neighbours, out=self._candidates[:count])
+            moves = np.compress(free, self._moves[:n], out=self._candidate_moves[:count])
+
+            # a cell reached from two parents in this layer appears twice,
+            # with two different moves: only the move written last is kept
+            move[candidates] = moves
+            first = np.equal(np.take(move, candidates, out=self._recorded[:count],
+                                     mode="clip"), moves, out=self._mask[:count])
+            added = np.count_nonzero(first)
+            new = np.compress(first, candidates, out=queue[high:high + added])
+            board[new] = VISITED
+            layers += 1
+            low, high = high, high + added
+
+            if target >= 0 and board[target] == VISITED:
+                found = True
+                break
+            if pending:
+                for index in pending:
+                    if board[index] == VISITED:
+                        goals[index] = layers
+                pending = [index for index in pending if goals[index] is None]
+                if not pending:
+                    break
+
+        return found, layers, high - 1
+
+    def _trace(self, index):
+        """
+        Cells from the last search's start to index, index first (the start
+        itself not included).
+        """
+        move, offsets = self._move, self._offset_list
+        path = []
+        while move[index] >= 0:
+            path.append(self.cell(index))
+            index -= offsets[move[index]]
+        return path
+
+    def _tail_reachable(self, path, snake):
+        """Could the snake reach its tail after following path and eating?"""
+        length = len(snake) + 1
+        body = path[:length]               # head first; path is food first
+        kept = length - len(body)          # segments of the current body left
+        tail = body[-1] if kept == 0 else snake[kept - 1]
+
+        self._reset()
+        board = self._board
+        board[[self.index(cell) for cell in
+               islice(reversed(snake.segments), len(snake) - kept)]] = FREE
+        board[[self.index(cell) for cell in body]] = BLOCKED
+        found, _, _ = self._search(self.index(body[0]), self.index(tail))
+        return found
+
+    def _plan(self, snake, food):
+        """Path to the food (food first) that keeps the tail reachable, or []."""
+        self._reset()
+        found, _, _ = self._search(self.index(snake.head), self.index(food))
+        if not found:
+            return []
+        path = self._trace(self.index(food))
+        if not self._tail_reachable(path, snake):
+            return []
+        return path
+
+    def _stall(self, snake):
+        """
+        Path (next cell last) that chases the tail, for when there is no
+        safe path to the food. Starts with the free neighbour from which the
+        tail is furthest away, or, if the tail can't be reached from any,
+        the one with the most free space around it. [] if stuck.
+
+        One search from the tail gives every neighbour's distance to it;
+        the free space around a neighbour is only counted when none of them
+        can reach the tail.
+        """
+        head_x, head_y = snake.head
+        neighbours = [self.index((head_x + dx, head_y + dy)) for dx, dy in MOVES]
+        free = [index for index in neighbours if not self._snake_grid[index]]
+        if not free:
+            return []
+
+        self._reset()
+        tail = self.index(snake.tail)
+        distance = dict.fromkeys(free)
+        self._search(tail, goals=distance)
+        reachable = [index for index in free if distance[index] is not None]
+        if reachable:
+            # furthest first; ties go to the earlier move, as in MOVES
+            best = max(reachable, key=distance.get)
+            # the way back to the tail, which _trace() stops one short of:
+            # the tail is still occupied on arrival
+            path = self._trace(best)
+            path.reverse()
+            return path
+
+        best, best_space = None, -1
+        for index in free:
+            self._reset()
+            _, _, space = self._search(index)
+            if space > best_space:
+                best, best_space = index, space
+        return [self.cell(best)]
+
+    # ---------- public ----------
+
+    def next_direction(self, snake, food, current_direction):
+        """Same interface as choose_ai_direction: the [dx, dy] to move."""
+        if food is None:
+            return current_direction
+
+        path = self._path
+        if path and self._food == food:
+            nx, ny = path[-1]
+            head_x, head_y = snake.head
+            if abs(nx - head_x) + abs(ny - head_y) == 1 and (nx, ny) not in snake:
+                path.pop()
+                return [nx - head_x, ny - head_y]
+
+        self._attach(snake)
+        self._food = food
+        if self.budget is not None:
+            self._deadline = time.perf_counter() + self.budget
+        try:
+            self._path = path = self._plan(snake, food) or self._stall(snake)
+        except _OutOfTime:
+            self._path = []
+            return choose_ai_direction(snake, food, current_direction,
+                                       self.cols, self.rows)
+        if not path:
+            return current_direction  # completely stuck, just keep going
+        nx, ny = path.pop()
+        head_x, head_y = snake.head
+        return [nx - head_x, ny - head_y]
+
+    def __call__(self, snake, food, current_direction):
+        return self.next_direction(snake, food, current_direction)
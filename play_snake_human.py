@@ -1,13 +1,18 @@
 from snake_env import SnakeEnv
+from terminal_renderer import TerminalRenderer
 
 env = SnakeEnv(grid_size=10)
 
 state = env.reset()
 
+# no frame cap: the board is redrawn after every key
+renderer = TerminalRenderer(env.grid_size, fps=0)
+status = "Start"
+
 while True:
-    env.render()  # show the board
+    renderer.draw(env.snake, env.food, status)  # show the board
 
-    action = input("Action (w=UP, s=DOWN, a=LEFT, d=RIGHT, q=quit): ")
+    action = renderer.input("Action (w=UP, s=DOWN, a=LEFT, d=RIGHT, q=quit): ")
 
     if action == "q":
         break
@@ -21,14 +26,16 @@ while True:
     elif action == "d":
         action = "RIGHT"
     else:
-        print("Invalid key!")
+        status = "Invalid key!"
         continue
 
     state, reward, done = env.step(action)
 
-    print("Reward:", reward)
+    status = f"Reward: {reward}"
 
     if done:
+        renderer.draw(env.snake, env.food, status)
         print("Game over!")
-        env.render()
         break
+
+renderer.close()
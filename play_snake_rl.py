@@ -1,24 +1,11 @@
-import time
-from snake_env import SnakeEnv
-from q_learning_snake import Q, ACTIONS
+# play_snake_rl.py
+#
+# Older name of play_trained_agent.py, kept so existing commands still
+# work. It plays a little slower, at about 3 frames per second.
 
-env = SnakeEnv(grid_size=10)
-state = env.reset()
+import sys
 
-while True:
-    env.render()
+from snake.__main__ import main
 
-    # choose the best learned action (no exploration)
-    best_action = max(ACTIONS, key=lambda a: Q[(state, a)])
-
-    print("Action:", best_action)
-
-    state, reward, done = env.step(best_action)
-
-    print("Reward:", reward)
-    time.sleep(0.3)  # slow the animation down so you can see it
-
-    if done:
-        print("Game Over")
-        env.render()
-        break
+if __name__ == "__main__":
+    sys.exit(main(["play", "--policy", "qtable", "--fps", "3.3"] + sys.argv[1:]))
@@ -1,31 +1,13 @@
-import time
-import pickle
-from snake_env import SnakeEnv
+# play_trained_agent.py
+#
+# Watch the trained agent play in the terminal. The player itself is
+# snake/player.py; this is the same as
+#     python -m snake play --policy qtable
+# and takes the same options (--fps, --episodes, --max-steps, ...).
 
-# Load trained Q-table
-with open("q_table.pkl", "rb") as f:
-    Q = pickle.load(f)
+import sys
 
-ACTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
+from snake.__main__ import main
 
-env = SnakeEnv(grid_size=10)
-state = env.reset()
-
-while True:
-    env.render()
-
-    # Choose the best action according to the Q-table
-    best_action = max(ACTIONS, key=lambda a: Q.get((state, a), 0))
-
-    print("Action:", best_action)
-
-    next_state, reward, done = env.step(best_action)
-    print("Reward:", reward)
-
-    state = next_state
-    time.sleep(0.2)
-
-    if done:
-        print("Game Over")
-        env.render()
-        break
+if __name__ == "__main__":
+    sys.exit(main(["play", "--policy", "qtable"] + sys.argv[1:]))
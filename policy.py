@@ -0,0 +1,163 @@
+# policy.py
+
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+from snake_env import ACTIONS
+from qtable import QTABLE_FILE, load_qtable
+from relative_state import NUM_RELATIVE_STATES
+
+POLICY_FILE = "q_policy.qpol"
+
+# Compiled policy file: a fixed 64-byte little-endian header followed by one
+# uint8 action index per state, in QTable.encode() order.
+#   magic, version, header size, grid size, num states,
+#   comma-separated action names
+POLICY_MAGIC = b"SNAKEPL\0"
+POLICY_VERSION = 1
+POLICY_HEADER = struct.Struct("<8sHHII44s")
+POLICY_HEADER_SIZE = 64
+
+# rows per argmax chunk in compile_policy(), to bound temporary memory
+COMPILE_CHUNK = 1 << 20
+
+
+class GreedyPolicy:
+    """
+    The greedy action of a Q-table for every state, one byte per state.
+
+    action(state) is a single array index, with no Q values involved, and
+    never adds entries for unseen states. Lookups go through a memoryview of
+    the array, which returns plain ints and is much cheaper to index than
+    the NumPy array itself.
+    """
+
+    state_encoding = "absolute"
+
+    def __init__(self, grid_size, actions):
+        self.grid_size = grid_size
+        self.num_states = self.count_states(grid_size)
+        if actions.shape != (self.num_states,):
+            raise ValueError(f"Expected {self.num_states} actions, got {actions.shape}")
+        self.actions = actions
+        self._lookup = memoryview(np.ascontiguousarray(actions))
+
+    @staticmethod
+    def count_states(grid_size):
+        return grid_size ** 4
+
+    def encode(self, state):
+        """Map (head_x, head_y, food_x, food_y) to a state index."""
+        head_x, head_y, food_x, food_y = state
+        g = self.grid_size
+        return ((head_x * g + head_y) * g + food_x) * g + food_y
+
+    def action_index(self, state):
+        return self._lookup[self.encode(state)]
+
+    def action(self, state):
+        """Greedy action name for one state."""
+        return ACTIONS[self._lookup[self.encode(state)]]
+
+    # ----- saving / loading -----
+
+    def save(self, path):
+        header = POLICY_HEADER.pack(
+            POLICY_MAGIC, POLICY_VERSION, POLICY_HEADER_SIZE, self.grid_size,
+            self.num_states, ",".join(ACTIONS).encode("ascii"),
+        )
+        with open(path, "wb") as f:
+            f.write(header.ljust(POLICY_HEADER_SIZE, b"\0"))
+            f.write(np.ascontiguousarray(self.actions, dtype=np.uint8).tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """Load a compiled policy file (memory-mapped, read-only)."""
+        with open(path, "rb") as f:
+            raw = f.read(POLICY_HEADER_SIZE)
+        if len(raw) < POLICY_HEADER_SIZE or not raw.startswith(POLICY_MAGIC):
+            raise ValueError(f"{path} is not a compiled policy file")
+        _, version, header_size, grid_size, num_states, actions = POLICY_HEADER.unpack_from(raw)
+        if version != POLICY_VERSION:
+            raise ValueError(f"{path}: unsupported policy version {version}")
+        actions = actions.rstrip(b"\0").decode("ascii").split(",")
+        if actions != ACTIONS:
+            raise ValueError(f"{path}: action order {actions} does not match {ACTIONS}")
+        policy_class = RelativeGreedyPolicy if grid_size == 0 else GreedyPolicy
+        if num_states != policy_class.count_states(grid_size):
+            raise ValueError(f"{path}: bad number of states {num_states}")
+
+        table = np.memmap(path, dtype=np.uint8, mode="r", offset=header_size,
+                          shape=(num_states,))
+        return policy_class(grid_size, table)
+
+
+class RelativeGreedyPolicy(GreedyPolicy):
+    """GreedyPolicy of a RelativeQTable: plays on any board size (grid_size 0)."""
+
+    state_encoding = "relative"
+
+    def __init__(self, grid_size, actions):
+        super().__init__(0, actions)
+
+    @staticmethod
+    def count_states(grid_size):
+        return NUM_RELATIVE_STATES
+
+    def encode(self, state):
+        return state
+
+
+def compile_policy(Q):
+    """
+    Precompute the greedy action of every state of QTable Q.
+
+    Ties go to the first action, as in QTable.best_action().
+    """
+    actions = np.empty(Q.num_states, dtype=np.uint8)
+    for start in range(0, Q.num_states, COMPILE_CHUNK):
+        stop = start + COMPILE_CHUNK
+        actions[start:stop] = Q.values[start:stop].argmax(axis=1)
+    if Q.state_encoding == "relative":
+        return RelativeGreedyPolicy(0, actions)
+    return GreedyPolicy(Q.grid_size, actions)
+
+
+def load_policy(path=None):
+    """
+    Load a compiled policy.
+
+    Without a path, q_policy.qpol is used if it exists; otherwise the
+    default Q-table is loaded and compiled in memory.
+    """
+    if path is None:
+        if not os.path.exists(POLICY_FILE):
+            return compile_policy(load_qtable())
+        path = POLICY_FILE
+    return GreedyPolicy.load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile a Q-table into a greedy-policy lookup table."
+    )
+    parser.add_argument("source", nargs="?", default=QTABLE_FILE)
+    parser.add_argument("dest", nargs="?", default=POLICY_FILE)
+    args = parser.parse_args()
+
+    Q = load_qtable(args.source)
+    start = time.perf_counter()
+    policy = compile_policy(Q)
+    elapsed = time.perf_counter() - start
+    policy.save(args.dest)
+    print(f"Compiled {Q.num_states:,} states in {elapsed:.3f}s")
+    board = (f"grid {policy.grid_size}x{policy.grid_size}" if policy.grid_size
+             else "relative states, any grid")
+    print(f"Wrote {args.dest} ({os.path.getsize(args.dest) / 1024:,.0f} KB, {board})")
+
+
+if __name__ == "__main__":
+    main()
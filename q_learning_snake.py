@@ -1,34 +1,29 @@
 # q_learning_snake.py
 
+import argparse
 import random
 import time
-from collections import defaultdict
-from snake_env import SnakeEnv
+from snake_env import SnakeEnv, ACTIONS
+from qtable import QTABLE_FILE, ACTION_INDEX, qtable_for
+from replay_buffer import ReplayBuffer
+from metrics import EpisodeMetrics
+from checkpoint import Checkpointer, load_checkpoint
+from training_profiler import TrainingProfiler, print_report
+from terminal_renderer import TerminalRenderer
 
-# 1. Create environment
-env = SnakeEnv(grid_size=10)
-
-# 2. Define actions
-ACTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
-
-# 3. Q-table: maps (state, action) -> value
-# Using defaultdict so unseen pairs default to 0.0
-Q = defaultdict(float)
-
-# 4. Hyperparameters
+# Default hyperparameters
 alpha = 0.1      # learning rate
 gamma = 0.9      # discount factor
 epsilon = 0.1    # exploration rate
+epsilon_decay = 1.0   # epsilon is multiplied by this after every episode
+min_epsilon = 0.0     # ... but never goes below this
 
-# For WATCHING the snake, keep episodes small.
-# When you just want to train, you can set this back to e.g. 2000.
-num_episodes = 3
+num_episodes = 5000
 max_steps_per_episode = 200
 
-# To track metrics
-rewards_per_episode = []
-foods_per_episode = []
-steps_per_episode = []
+# Experience replay (only used with --replay)
+batch_size = 32     # transitions per batched update
+replay_every = 1    # env steps between batched updates
 
 
 def manhattan_distance(state):
@@ -37,53 +32,127 @@ def manhattan_distance(state):
     return abs(head_x - food_x) + abs(head_y - food_y)
 
 
-def choose_action(state):
+def food_distance(env):
+    """Manhattan distance between the env's snake head and food (any state encoding)."""
+    head_x, head_y = env.snake.head
+    food_x, food_y = env.food
+    return abs(head_x - food_x) + abs(head_y - food_y)
+
+
+def epsilon_at(episode, epsilon, epsilon_decay=epsilon_decay, min_epsilon=min_epsilon):
+    """Exploration rate for a given (0-based) episode of the schedule."""
+    return max(min_epsilon, epsilon * epsilon_decay ** episode)
+
+
+def _rng_state(rng):
+    version, internal, gauss_next = rng.getstate()
+    return [version, list(internal), gauss_next]
+
+
+def _set_rng_state(rng, state):
+    version, internal, gauss_next = state
+    rng.setstate((version, tuple(internal), gauss_next))
+
+
+def training_state(epsilon, epsilon_decay, min_epsilon, env=None, replay=None):
+    """
+    Run state saved with each checkpoint: epsilon schedule, the global RNG
+    state and, with env, the state of its episode-seed RNG. With a
+    ReplayBuffer, its position and RNG state too (its transitions are saved
+    as checkpoint arrays, see save_checkpoint()).
+    """
+    state = {
+        "epsilon": epsilon,
+        "epsilon_decay": epsilon_decay,
+        "min_epsilon": min_epsilon,
+        "random_state": _rng_state(random),
+    }
+    if env is not None:
+        state["env_random_state"] = _rng_state(env.seeds)
+    if replay is not None:
+        state["replay"] = replay.get_state()
+    return state
+
+
+def save_checkpoint(checkpointer, Q, episode, epsilon, epsilon_decay, min_epsilon,
+                    env, replay=None):
+    """Queue a checkpoint of everything needed to resume the run exactly."""
+    checkpointer.save(Q, episode,
+                      training_state(epsilon, epsilon_decay, min_epsilon, env, replay),
+                      replay.arrays() if replay is not None else None)
+
+
+def restore_random_state(state, env=None):
+    """Put the global RNG (and env's RNG) back to where training_state() saw them."""
+    _set_rng_state(random, state["random_state"])
+    if env is not None and "env_random_state" in state:
+        _set_rng_state(env.seeds, state["env_random_state"])
+
+
+def choose_action(Q, state, epsilon):
     """Epsilon-greedy policy."""
     if random.random() < epsilon:
         # explore
         return random.choice(ACTIONS)
     else:
         # exploit: choose action with highest Q-value for this state
-        best_action = None
-        best_value = float("-inf")
+        return Q.best_action(state)
+
+
+def run_episode(env, Q, alpha, gamma, epsilon, max_steps, render=None, profiler=None,
+                replay=None, batch_size=batch_size, replay_every=replay_every):
+    """
+    Play one training episode and update Q in place.
 
-        for a in ACTIONS:
-            q = Q[(state, a)]
-            if q > best_value:
-                best_value = q
-                best_action = a
+    render: a TerminalRenderer to draw every step into (it also sets the pace)
 
-        return best_action
+    If a TrainingProfiler is given, the time spent in each phase of every
+    step is recorded; without one, no timers are read at all.
 
+    With a ReplayBuffer, each transition is stored in it instead of being
+    learned from directly, and every `replay_every` env steps (counted
+    across episodes by the buffer) a minibatch of `batch_size` stored
+    transitions is applied with Q.update_batch().
 
-# 5. Training loop
-for episode in range(num_episodes):
+    returns: (total_reward, steps, foods_eaten)
+    """
     state = env.reset()
-    done = False
     total_reward = 0.0
     steps = 0
     foods_eaten = 0
+    clock = time.perf_counter if profiler is not None else None
 
-    print(f"\n=== EPISODE {episode + 1}/{num_episodes} ===")
+    for step in range(max_steps):
+        if clock:
+            t0 = clock()
 
-    for step in range(max_steps_per_episode):
         # distance to food BEFORE action
-        dist_before = manhattan_distance(state)
+        dist_before = food_distance(env)
+
+        if clock:
+            t1 = clock()
 
         # choose action using epsilon-greedy policy
-        action = choose_action(state)
+        action = choose_action(Q, state, epsilon)
+
+        if clock:
+            t2 = clock()
 
         # take action in environment
+        length = len(env.snake)
         next_state, reward, done = env.step(action)
 
-        # ----- RENDER HERE SO YOU CAN SEE THE SNAKE -----
-        env.render()
-        print("Action:", action, "Reward:", reward)
-        time.sleep(0.2)   # slow it down so you can watch
-        # ------------------------------------------------
+        if clock:
+            t3 = resumed = clock()
+
+        if render is not None:
+            render.draw(env.snake, env.food, f"Action: {action}  Reward: {reward}")
+            if clock:
+                # drawing and its pacing are left out of every phase
+                resumed = clock()
 
         # distance to food AFTER action
-        dist_after = manhattan_distance(next_state)
+        dist_after = food_distance(env)
 
         # reward shaping: give small hint
         if not done:  # if we didn't just crash
@@ -94,40 +163,246 @@ for episode in range(num_episodes):
                 # moved farther from food
                 reward -= 0.1
 
-        # approximate count: if reward is >= 1, we probably ate food
-        if reward >= 1:
+        # the snake only grows when it eats
+        if len(env.snake) > length:
             foods_eaten += 1
 
         steps += 1
 
         # Q-learning update:
-        current_q = Q[(state, action)]
-        max_next_q = max(Q[(next_state, a)] for a in ACTIONS)
-        td_target = reward + gamma * max_next_q
-        td_error = td_target - current_q
-        Q[(state, action)] = current_q + alpha * td_error
+        # Q(s,a) <- Q(s,a) + alpha * (reward + gamma * max Q(s') - Q(s,a))
+        if clock:
+            t4 = clock()
+
+        if replay is None:
+            Q.update(state, action, reward, next_state, alpha, gamma)
+        else:
+            replay.append(Q.encode(state), ACTION_INDEX[action], reward,
+                          Q.encode(next_state), done)
+            if len(replay) >= batch_size and replay.appended % replay_every == 0:
+                states, actions, rewards, next_states, dones = replay.sample(batch_size)
+                Q.update_batch(states, actions, rewards, next_states, alpha, gamma, dones)
+
+        if clock:
+            profiler.record_step(state, t2 - t1, t3 - t2, (t1 - t0) + (t4 - resumed),
+                                 clock() - t4)
 
         state = next_state
         total_reward += reward
 
         if done:
-            print("Episode ended (crash).")
+            if render:
+                print("Episode ended (won)." if env.won else "Episode ended (crash).")
             break
 
-    # after the episode ends, store the results
-    rewards_per_episode.append(total_reward)
-    foods_per_episode.append(foods_eaten)
-    steps_per_episode.append(steps)
+    return total_reward, steps, foods_eaten
+
+
+def train(env, episodes, alpha, gamma, epsilon, render_every=None, seed=None,
+          max_steps=max_steps_per_episode, Q=None, profiler=None,
+          replay=None, batch_size=batch_size, replay_every=replay_every,
+          metrics=None, log_every=None, epsilon_decay=epsilon_decay,
+          min_epsilon=min_epsilon, start_episode=0, checkpointer=None):
+    """
+    Train a Q-table on env with epsilon-greedy Q-learning.
+
+    Runs headless. If render_every is set, every Nth episode is drawn in the
+    terminal at 5 frames per second so it can be watched; all other
+    episodes run at full speed. Pass Q to keep training an existing table, and a
+    TrainingProfiler (built on the same Q) to collect per-phase timings.
+    Pass a ReplayBuffer to learn from replayed minibatches (see run_episode).
+
+    Episode results go into `metrics` (a new EpisodeMetrics by default),
+    which takes constant memory however long the run. With log_every, the
+    moving averages are printed every that many episodes.
+
+    Episode e explores with epsilon_at(e, epsilon, epsilon_decay,
+    min_epsilon). start_episode continues a run (from a checkpoint) at that
+    episode, up to `episodes` in total. A Checkpointer gets a
+    save_checkpoint() whenever checkpointer.due(episode) and at the end.
+
+    returns: (Q, metrics)
+    """
+    if seed is not None:
+        random.seed(seed)
+        env.seed(random.getrandbits(64))
+    if Q is None:
+        Q = qtable_for(env)
+
+    if metrics is None:
+        metrics = EpisodeMetrics(start=start_episode)
+    renderer = TerminalRenderer(env.grid_size, fps=5) if render_every else None
+
+    for episode in range(start_episode, episodes):
+        render = bool(render_every) and (episode + 1) % render_every == 0
+        if render:
+            print(f"\n=== EPISODE {episode + 1}/{episodes} ===")
+            renderer.invalidate()
+
+        total_reward, steps, foods_eaten = run_episode(
+            env, Q, alpha, gamma, epsilon_at(episode, epsilon, epsilon_decay, min_epsilon),
+            max_steps, render=renderer if render else None, profiler=profiler,
+            replay=replay, batch_size=batch_size, replay_every=replay_every,
+        )
+        if profiler is not None:
+            profiler.end_episode()
+
+        # after the episode ends, record the results
+        metrics.add(total_reward, foods_eaten, steps)
+
+        if log_every and (episode + 1) % log_every == 0:
+            print_progress(metrics)
+
+        if render:
+            renderer.close()
+            print(f"Episode {episode + 1} finished: total_reward={total_reward:.2f}, "
+                  f"steps={steps}, foods_eaten={foods_eaten}")
+
+        # the run state is only built when it is saved: it copies the RNG states
+        if checkpointer is not None and checkpointer.due(episode + 1):
+            save_checkpoint(checkpointer, Q, episode + 1, epsilon, epsilon_decay,
+                            min_epsilon, env, replay)
+
+    if checkpointer is not None and episodes > start_episode and (
+            not checkpointer.every or episodes % checkpointer.every):
+        save_checkpoint(checkpointer, Q, episodes, epsilon, epsilon_decay, min_epsilon,
+                        env, replay)
+
+    return Q, metrics
+
+
+def print_progress(metrics):
+    """One line with the moving averages of an EpisodeMetrics."""
+    recent = metrics.recent
+    print(f"Episode {metrics.episodes}: last {recent['reward'].size} episodes "
+          f"reward {recent['reward'].mean:.2f}  foods {recent['foods'].mean:.2f}  "
+          f"steps {recent['steps'].mean:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a Q-learning Snake agent.")
+    parser.add_argument("--episodes", type=int, default=num_episodes)
+    parser.add_argument("--alpha", type=float, default=alpha, help="learning rate")
+    parser.add_argument("--gamma", type=float, default=gamma, help="discount factor")
+    parser.add_argument("--epsilon", type=float, default=epsilon, help="exploration rate")
+    parser.add_argument("--epsilon-decay", type=float, default=epsilon_decay,
+                        help="multiply epsilon by this after every episode")
+    parser.add_argument("--min-epsilon", type=float, default=min_epsilon)
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--state", choices=["absolute", "relative"], default="absolute",
+                        help="relative = 9-bit danger/heading/food-direction state "
+                             "(a 512-row table that works on any board size)")
+    parser.add_argument("--max-steps", type=int, default=max_steps_per_episode,
+                        help="step limit per episode")
+    parser.add_argument("--render-every", type=int, default=None, metavar="N",
+                        help="watch every Nth episode in the terminal")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--profile", action="store_true",
+                        help="print per-phase timings and counters while training")
+    parser.add_argument("--profile-jsonl", metavar="PATH",
+                        help="append profiling reports to this JSONL file")
+    parser.add_argument("--profile-every", type=int, default=100_000, metavar="STEPS",
+                        help="steps between profiling reports")
+    parser.add_argument("--replay", type=int, default=0, metavar="CAPACITY",
+                        help="learn from an experience replay buffer of this size")
+    parser.add_argument("--batch-size", type=int, default=batch_size,
+                        help="replay minibatch size")
+    parser.add_argument("--replay-every", type=int, default=replay_every, metavar="STEPS",
+                        help="env steps between replay updates")
+    parser.add_argument("--log-every", type=int, default=None, metavar="N",
+                        help="print moving averages every N episodes")
+    parser.add_argument("--window", type=int, default=100,
+                        help="episodes in the moving averages")
+    parser.add_argument("--metrics-csv", metavar="PATH",
+                        help="append one CSV row per episode to this file")
+    parser.add_argument("--checkpoint-dir", metavar="DIR",
+                        help="write checkpoints to this directory")
+    parser.add_argument("--checkpoint-every", type=int, default=10_000, metavar="N",
+                        help="episodes between checkpoints")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the checkpoint in --checkpoint-dir")
+    parser.add_argument("--output", default=QTABLE_FILE,
+                        help="where to save the Q-table (.pkl for a pickle)")
+    args = parser.parse_args()
+
+    env = SnakeEnv(grid_size=args.grid_size, state_encoding=args.state)
+    Q = qtable_for(env)
+
+    replay = ReplayBuffer(args.replay, seed=args.seed) if args.replay else None
+
+    seed = args.seed
+    start_episode = 0
+    schedule = (args.epsilon, args.epsilon_decay, args.min_epsilon)
+    if args.resume:
+        if not args.checkpoint_dir:
+            parser.error("--resume needs --checkpoint-dir")
+        restored = load_checkpoint(args.checkpoint_dir)
+        if restored is None:
+            print(f"No checkpoint in {args.checkpoint_dir}, starting from scratch")
+        else:
+            Q, start_episode, state = restored
+            if Q.state_encoding != env.state_encoding or (
+                    Q.state_encoding == "absolute" and Q.grid_size != env.grid_size):
+                parser.error("checkpoint does not match --grid-size / --state")
+            schedule = (state["epsilon"], state["epsilon_decay"], state["min_epsilon"])
+            restore_random_state(state, env)
+            if replay is not None:
+                if "replay" not in state:
+                    parser.error("checkpoint was written without --replay")
+                if state["replay"]["capacity"] != args.replay:
+                    parser.error(f"checkpoint has a replay buffer of "
+                                 f"{state['replay']['capacity']}, not {args.replay}")
+                replay.restore(state["replay"], state.get("arrays", {}))
+            seed = None  # the restored RNG state replaces the seed
+            print(f"Resuming from episode {start_episode}")
+
+    checkpointer = None
+    if args.checkpoint_dir:
+        checkpointer = Checkpointer(args.checkpoint_dir, every=args.checkpoint_every)
+
+    metrics = EpisodeMetrics(window=args.window, log_path=args.metrics_csv,
+                             start=start_episode)
+
+    profiler = None
+    if args.profile or args.profile_jsonl:
+        profiler = TrainingProfiler(
+            Q, report_every=args.profile_every,
+            callback=print_report if args.profile else None,
+            jsonl_path=args.profile_jsonl,
+        )
+
+    start = time.perf_counter()
+    Q, metrics = train(
+        env, args.episodes, args.alpha, args.gamma, schedule[0],
+        render_every=args.render_every, seed=seed, max_steps=args.max_steps,
+        Q=Q, profiler=profiler, replay=replay,
+        batch_size=args.batch_size, replay_every=args.replay_every,
+        metrics=metrics, log_every=args.log_every,
+        epsilon_decay=schedule[1], min_epsilon=schedule[2],
+        start_episode=start_episode, checkpointer=checkpointer,
+    )
+    elapsed = time.perf_counter() - start
+    if profiler is not None:
+        profiler.close()
 
-    print(f"Episode {episode + 1} finished: total_reward={total_reward:.2f}, "
-          f"steps={steps}, foods_eaten={foods_eaten}")
+    if checkpointer is not None:
+        checkpointer.close()
+    metrics.close()
+    Q.save(args.output)
 
-# After training, print averages over all episodes we just ran
-avg_reward = sum(rewards_per_episode) / len(rewards_per_episode)
-avg_foods = sum(foods_per_episode) / len(foods_per_episode)
-avg_steps = sum(steps_per_episode) / len(steps_per_episode)
+    # After training, print statistics over all episodes we just ran
+    stats = metrics.stats
+    print("\n=== SUMMARY OVER ALL EPISODES RUN ===")
+    print(f"Episodes: {metrics.start + 1}-{metrics.episodes} "
+          f"({metrics.episodes - metrics.start} run) in {elapsed:.1f}s")
+    print(f"Average reward: {stats['reward'].mean:.2f} (std {stats['reward'].std:.2f})")
+    print(f"Average foods eaten: {stats['foods'].mean:.2f} "
+          f"(p50 {metrics.quantile('foods', 0.5):.1f}, p90 {metrics.quantile('foods', 0.9):.1f}, "
+          f"max {stats['foods'].max})")
+    print(f"Average steps survived: {stats['steps'].mean:.2f}")
+    print(f"Last {metrics.recent['foods'].size} episodes: "
+          f"average foods {metrics.recent['foods'].mean:.2f}")
+    print(f"Q-table saved to {args.output}")
 
-print("\n=== SUMMARY OVER ALL EPISODES RUN ===")
-print(f"Average reward: {avg_reward:.2f}")
-print(f"Average foods eaten: {avg_foods:.2f}")
-print(f"Average steps survived: {avg_steps:.2f}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+# qtable.py
+
+import argparse
+import os
+import pickle
+import struct
+
+import numpy as np
+from snake_env import ACTIONS
+from relative_state import NUM_RELATIVE_STATES
+
+# action name -> column in the Q array
+ACTION_INDEX = {a: i for i, a in enumerate(ACTIONS)}
+
+QTABLE_FILE = "q_table.qtb"
+LEGACY_QTABLE_FILE = "q_table.pkl"
+
+# Binary Q-table file: a fixed 64-byte little-endian header followed by the
+# raw (num_states, num_actions) array in C order.
+#   magic, version, header size, grid size, num states, num actions,
+#   dtype string (numpy notation, always "<f4"), comma-separated action names
+BINARY_MAGIC = b"SNAKEQT\0"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<8sHHIIH4s38s")
+BINARY_HEADER_SIZE = 64
+BINARY_DTYPE = b"<f4"        # the only value type written or accepted
+
+
+class QTable:
+    """
+    Dense Q-table for SnakeEnv stored in one float32 array.
+
+    Every state (head_x, head_y, food_x, food_y) on a grid_size board is
+    mapped to a row index by encode(); the columns follow ACTIONS. Unseen
+    states are simply rows of zeros, like the old defaultdict(float).
+
+    Q[(state, action)] still works for reading and writing, so code written
+    against the dict version keeps running.
+    """
+
+    state_encoding = "absolute"
+
+    def __init__(self, grid_size=10, values=None):
+        self.grid_size = grid_size
+        self.num_states = self.count_states(grid_size)
+        shape = (self.num_states, len(ACTIONS))
+        if values is None:
+            values = np.zeros(shape, dtype=np.float32)
+        elif values.shape != shape:
+            raise ValueError(f"Expected Q values of shape {shape}, got {values.shape}")
+        elif not values.flags.c_contiguous:
+            # reshape(-1) below would silently copy, and _flat would stop
+            # seeing updates made to self.values
+            values = np.ascontiguousarray(values)
+        self.values = values
+        # the same values as one flat sequence of Python floats, so that
+        # best_action() can read a row without creating any NumPy objects
+        self._flat = memoryview(values.reshape(-1))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_flat"]          # memoryviews can't be pickled
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._flat = memoryview(self.values.reshape(-1))
+
+    # ----- state encoding -----
+
+    @staticmethod
+    def count_states(grid_size):
+        return grid_size ** 4
+
+    def encode(self, state):
+        """Map (head_x, head_y, food_x, food_y) to a row index."""
+        head_x, head_y, food_x, food_y = state
+        g = self.grid_size
+        return ((head_x * g + head_y) * g + food_x) * g + food_y
+
+    def encode_batch(self, states):
+        """Vectorized encode() for an (N, 4) array of states."""
+        states = np.asarray(states, dtype=np.int64)
+        g = self.grid_size
+        return ((states[:, 0] * g + states[:, 1]) * g + states[:, 2]) * g + states[:, 3]
+
+    def decode(self, index):
+        """Inverse of encode()."""
+        g = self.grid_size
+        index, food_y = divmod(int(index), g)
+        index, food_x = divmod(index, g)
+        head_x, head_y = divmod(index, g)
+        return (head_x, head_y, food_x, food_y)
+
+    # ----- dict-style access -----
+
+    def __getitem__(self, key):
+        state, action = key
+        return float(self.values[self.encode(state), ACTION_INDEX[action]])
+
+    def __setitem__(self, key, value):
+        state, action = key
+        self.values[self.encode(state), ACTION_INDEX[action]] = value
+
+    # ----- policy -----
+
+    def best_action(self, state):
+        """Greedy action name for one state (first action wins ties)."""
+        # unrolled over the 4 actions: this runs on every greedy step
+        flat = self._flat
+        i = self.encode(state) * 4
+        best, value = 0, flat[i]
+        q = flat[i + 1]
+        if q > value:
+            best, value = 1, q
+        q = flat[i + 2]
+        if q > value:
+            best, value = 2, q
+        if flat[i + 3] > value:
+            best = 3
+        return ACTIONS[best]
+
+    def best_actions(self, indices):
+        """Greedy action indices for an array of encoded states."""
+        return self.values[indices].argmax(axis=1)
+
+    # ----- learning -----
+
+    def update(self, state, action, reward, next_state, alpha, gamma):
+        """One Q-learning update for a single (state, action) transition."""
+        s = self.encode(state)
+        a = ACTION_INDEX[action]
+        values = self.values
+        current_q = float(values[s, a])
+        max_next_q = max(values[self.encode(next_state)].tolist())
+        td_target = reward + gamma * max_next_q
+        values[s, a] = current_q + alpha * (td_target - current_q)
+
+    def update_batch(self, states, actions, rewards, next_states, alpha, gamma, dones=None):
+        """
+        Q-learning update for a batch of transitions.
+
+        states and next_states are encoded indices, actions are action
+        indices. All TD errors are computed from the table as it was before
+        the batch. A (state, action) pair that appears several times moves
+        by alpha times the mean of its TD errors, so a minibatch sampled
+        with repeats never overshoots the way summed updates would.
+        If dones is given, terminal transitions do not bootstrap from
+        next_states.
+        """
+        values = self.values
+        max_next_q = values[next_states].max(axis=1)
+        if dones is not None:
+            max_next_q = np.where(dones, 0.0, max_next_q)
+        td_error = rewards + gamma * max_next_q - values[states, actions]
+
+        num_actions = values.shape[1]
+        pairs = np.asarray(states, dtype=np.int64) * num_actions + actions
+        pairs, inverse, counts = np.unique(pairs, return_inverse=True, return_counts=True)
+        mean_error = np.bincount(inverse.ravel(), weights=td_error) / counts
+        states, actions = np.divmod(pairs, num_actions)
+        values[states, actions] += (alpha * mean_error).astype(np.float32)
+
+    # ----- conversion -----
+
+    @classmethod
+    def from_dict(cls, Q, grid_size=10):
+        """Build a QTable from the old {(state, action): value} dict."""
+        table = cls(grid_size)
+        for (state, action), value in Q.items():
+            table[(state, action)] = value
+        return table
+
+    def to_dict(self):
+        """Return the old {(state, action): value} dict (non-zero rows only)."""
+        Q = {}
+        for s in np.flatnonzero(self.values.any(axis=1)):
+            state = self.decode(s)
+            for a, action in enumerate(ACTIONS):
+                Q[(state, action)] = float(self.values[s, a])
+        return Q
+
+    @classmethod
+    def load_pickle(cls, path, grid_size=10):
+        """
+        Load a pickled QTable, or an old pickled dict (converted on the fly).
+
+        Only load pickles you trust.
+        """
+        with open(path, "rb") as f:
+            obj = pickle.load(f)
+        if isinstance(obj, QTable):
+            return obj
+        return cls.from_dict(obj, grid_size)
+
+    def save_pickle(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    def save_binary(self, path):
+        """Write the table in the binary format read by open_binary()."""
+        values = np.ascontiguousarray(self.values, dtype=BINARY_DTYPE.decode("ascii"))
+        header = BINARY_HEADER.pack(
+            BINARY_MAGIC, BINARY_VERSION, BINARY_HEADER_SIZE, self.grid_size,
+            self.num_states, len(ACTIONS), BINARY_DTYPE,
+            ",".join(ACTIONS).encode("ascii"),
+        )
+        with open(path, "wb") as f:
+            f.write(header.ljust(BINARY_HEADER_SIZE, b"\0"))
+            f.write(values.tobytes())
+
+    @classmethod
+    def open_binary(cls, path, mode="r"):
+        """
+        Open a binary Q-table as a numpy.memmap, without copying it.
+
+        With the default read-only mode, several processes opening the same
+        file share its pages. Use mode="r+" to update the file in place.
+        """
+        with open(path, "rb") as f:
+            raw = f.read(BINARY_HEADER_SIZE)
+        if len(raw) < BINARY_HEADER_SIZE or not raw.startswith(BINARY_MAGIC):
+            raise ValueError(f"{path} is not a binary Q-table file")
+        (_, version, header_size, grid_size, num_states, num_actions,
+         dtype, actions) = BINARY_HEADER.unpack_from(raw)
+        if version != BINARY_VERSION:
+            raise ValueError(f"{path}: unsupported Q-table version {version}")
+        actions = actions.rstrip(b"\0").decode("ascii").split(",")
+        if actions != ACTIONS:
+            raise ValueError(f"{path}: action order {actions} does not match {ACTIONS}")
+        table_class = qtable_class(grid_size)
+        if num_states != table_class.count_states(grid_size) or num_actions != len(ACTIONS):
+            raise ValueError(f"{path}: bad table shape ({num_states}, {num_actions})")
+        if dtype.rstrip(b"\0") != BINARY_DTYPE:
+            raise ValueError(f"{path}: unsupported value type {dtype!r}")
+        if header_size < BINARY_HEADER_SIZE:
+            raise ValueError(f"{path}: bad header size {header_size}")
+        expected = header_size + num_states * num_actions * 4
+        size = os.path.getsize(path)
+        if size != expected:
+            raise ValueError(f"{path}: expected {expected} bytes, file has {size}")
+
+        values = np.memmap(path, dtype=BINARY_DTYPE.decode("ascii"), mode=mode, offset=header_size,
+                           shape=(num_states, num_actions))
+        return table_class(grid_size, values=values)
+
+    def save(self, path):
+        """Save as a pickle if path ends in .pkl, otherwise in binary format."""
+        if path.endswith(".pkl"):
+            self.save_pickle(path)
+        else:
+            self.save_binary(path)
+
+
+class RelativeQTable(QTable):
+    """
+    QTable over the relative states of relative_state.encode_relative()
+    (SnakeEnv(state_encoding="relative")): NUM_RELATIVE_STATES rows on any
+    board size, so one table trained on a small board plays on any other.
+
+    Its grid_size is 0, which is also how binary files mark it.
+    """
+
+    state_encoding = "relative"
+
+    def __init__(self, grid_size=0, values=None):
+        super().__init__(0, values)
+
+    @staticmethod
+    def count_states(grid_size):
+        return NUM_RELATIVE_STATES
+
+    def encode(self, state):
+        return state
+
+    def encode_batch(self, states):
+        return np.asarray(states, dtype=np.int64)
+
+    def decode(self, index):
+        return int(index)
+
+
+def qtable_class(grid_size):
+    """QTable class for a stored grid size (0 = relative states)."""
+    return RelativeQTable if grid_size == 0 else QTable
+
+
+def qtable_for(env):
+    """Empty Q-table for a SnakeEnv's board size and state encoding."""
+    if env.state_encoding == "relative":
+        return RelativeQTable()
+    return QTable(env.grid_size)
+
+
+def is_binary_qtable(path):
+    with open(path, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def load_qtable(path=None):
+    """
+    Load a Q-table from a binary file (memory-mapped) or a pickle.
+
+    Without a path, q_table.qtb is used if it exists, else q_table.pkl.
+    """
+    if path is None:
+        path = QTABLE_FILE if os.path.exists(QTABLE_FILE) else LEGACY_QTABLE_FILE
+    if is_binary_qtable(path):
+        return QTable.open_binary(path)
+    return QTable.load_pickle(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert a pickled Q-table to the binary (memory-mappable) format."
+    )
+    parser.add_argument("source", nargs="?", default=LEGACY_QTABLE_FILE)
+    parser.add_argument("dest", nargs="?", default=QTABLE_FILE)
+    parser.add_argument("--grid-size", type=int, default=10,
+                        help="board size of an old dict pickle")
+    args = parser.parse_args()
+
+    Q = QTable.load_pickle(args.source, grid_size=args.grid_size)
+    Q.save_binary(args.dest)
+    print(f"Wrote {args.dest} ({os.path.getsize(args.dest) / 1024:,.0f} KB, "
+          f"grid {Q.grid_size}x{Q.grid_size})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,15 @@
 
 import random
 from snake_env import SnakeEnv
+from metrics import EpisodeMetrics
 
 ACTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
 
 num_episodes = 200
 max_steps_per_episode = 200
 
-rewards_per_episode = []
-foods_per_episode = []
-steps_per_episode = []
+# running statistics over the episodes (constant memory)
+metrics = EpisodeMetrics()
 
 
 def manhattan_distance(state):
@@ -45,17 +45,16 @@ for episode in range(num_episodes):
         if done:
             break
 
-    rewards_per_episode.append(total_reward)
-    foods_per_episode.append(foods_eaten)
-    steps_per_episode.append(steps)
+    metrics.add(total_reward, foods_eaten, steps)
 
-# compute averages over all episodes
-avg_reward = sum(rewards_per_episode) / len(rewards_per_episode)
-avg_foods = sum(foods_per_episode) / len(foods_per_episode)
-avg_steps = sum(steps_per_episode) / len(steps_per_episode)
+# averages over all episodes
+avg_reward = metrics.stats["reward"].mean
+avg_foods = metrics.stats["foods"].mean
+avg_steps = metrics.stats["steps"].mean
 
 print("=== RANDOM AGENT BASELINE (no learning) ===")
 print(f"Episodes: {num_episodes}")
 print(f"Average reward: {avg_reward:.2f}")
 print(f"Average foods eaten: {avg_foods:.2f}")
-print(f"Average steps survived: {avg_steps:.2f}")
+print(f"Average steps survived: {avg_steps:.2f} "
+      f"(p50 {metrics.quantile('steps', 0.5):.1f}, p90 {metrics.quantile('steps', 0.9):.1f})")
@@ -0,0 +1,57 @@
+# relative_state.py
+#
+# Compact, board-size-independent state for SnakeEnv:
+#
+#   bit 0      danger straight ahead   (wall or body in the next cell)
+#   bit 1      danger to the left
+#   bit 2      danger to the right
+#   bits 3-4   heading, as an index into ACTIONS
+#   bit 5      food is above the head
+#   bit 6      food is below the head
+#   bit 7      food is left of the head
+#   bit 8      food is right of the head
+#
+# 9 bits, so a Q-table over these states has 512 rows on any board.
+
+NUM_RELATIVE_STATES = 1 << 9
+
+# (dx, dy) per heading, in the same order as snake_env.ACTIONS
+HEADINGS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+HEADING_INDEX = {a: i for i, a in enumerate(HEADINGS)}
+HEADING_NAMES = list(HEADINGS)
+
+
+def encode_relative(snake, heading, food):
+    """
+    State integer for a SnakeBody moving in `heading` (an action name)
+    with the food at `food`. O(1): three occupancy-grid lookups.
+    """
+    head_x, head_y = snake.head
+    dx, dy = HEADINGS[heading]
+    blocked = snake.blocked
+    state = (
+        blocked(head_x + dx, head_y + dy)            # straight
+        | blocked(head_x + dy, head_y - dx) << 1     # left turn
+        | blocked(head_x - dy, head_y + dx) << 2     # right turn
+        | HEADING_INDEX[heading] << 3
+    )
+    food_x, food_y = food
+    if food_y < head_y:
+        state |= 1 << 5
+    elif food_y > head_y:
+        state |= 1 << 6
+    if food_x < head_x:
+        state |= 1 << 7
+    elif food_x > head_x:
+        state |= 1 << 8
+    return state
+
+
+def describe(state):
+    """Human-readable form of a relative state (for debugging)."""
+    danger = [name for bit, name in enumerate(("straight", "left", "right"))
+              if state >> bit & 1]
+    food = [name for bit, name in zip(range(5, 9), ("up", "down", "left", "right"))
+            if state >> bit & 1]
+    return (f"heading {HEADING_NAMES[state >> 3 & 3]}, danger {'/'.join(danger) or 'none'}, "
+            f"food {'/'.join(food) or 'here'}")
@@ -0,0 +1,82 @@
+# replay_buffer.py
+
+import numpy as np
+
+FIELDS = ("states", "actions", "rewards", "next_states", "dones")
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity experience replay for the tabular Q-learner.
+
+    Transitions are stored as parallel preallocated arrays (encoded states,
+    action indices, rewards, dones) used as a ring buffer: once full, each
+    append overwrites the oldest transition. Appending is O(1) and
+    allocates nothing; sample() draws a uniform minibatch with one fancy
+    index per array.
+    """
+
+    def __init__(self, capacity, seed=None):
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.int32)
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.int32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.position = 0   # next slot to write
+        self.size = 0
+        self.appended = 0   # transitions ever appended (env steps seen)
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def append(self, state, action, reward, next_state, done):
+        """Store one transition (encoded state indices, action index)."""
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.position = (i + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+        self.appended += 1
+
+    def sample(self, batch_size):
+        """
+        Uniform minibatch (with replacement) of stored transitions.
+
+        returns: (states, actions, rewards, next_states, dones) arrays
+        """
+        idx = self.rng.integers(0, self.size, size=batch_size)
+        return (self.states[idx], self.actions[idx], self.rewards[idx],
+                self.next_states[idx], self.dones[idx])
+
+    def get_state(self):
+        """Position, size, append count and RNG state as a JSON-serialisable dict."""
+        return {
+            "capacity": self.capacity,
+            "position": self.position,
+            "size": self.size,
+            "appended": self.appended,
+            "random_state": self.rng.bit_generator.state,
+        }
+
+    def arrays(self):
+        """The stored transitions, {field: array}, for a checkpoint."""
+        return {field: getattr(self, field)[:self.size] for field in FIELDS}
+
+    def restore(self, state, arrays):
+        """Put back a buffer saved with get_state() and arrays()."""
+        if state["capacity"] != self.capacity:
+            raise ValueError(f"Replay buffer capacity {state['capacity']} "
+                             f"does not match {self.capacity}")
+        size = state["size"]
+        for field in FIELDS:
+            getattr(self, field)[:size] = arrays[field]
+        self.position = state["position"]
+        self.size = size
+        self.appended = state["appended"]
+        self.rng.bit_generator.state = state["random_state"]
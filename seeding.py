@@ -0,0 +1,12 @@
+# seeding.py
+#
+# Seeds for independent random streams derived from one base seed, shared
+# by the multi-process trainer, the sweep and the evaluation harness.
+
+import numpy as np
+
+
+def worker_seeds(seed, workers):
+    """Independent per-worker seeds derived from one base seed."""
+    seq = np.random.SeedSequence(seed)
+    return [int(child.generate_state(1)[0]) for child in seq.spawn(workers)]
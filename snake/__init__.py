@@ -0,0 +1,41 @@
+# snake/__init__.py
+#
+# One import point for the project's modules, loaded lazily: `import snake`
+# costs almost nothing, and e.g. snake.QTable only imports qtable (and
+# NumPy) the first time it is used. The command line is in __main__.py.
+
+import importlib
+
+# public name -> module that defines it
+_EXPORTS = {
+    "SnakeEnv": "snake_env",
+    "ACTIONS": "snake_env",
+    "SnakeGame": "snake_game",
+    "QTable": "qtable",
+    "RelativeQTable": "qtable",
+    "load_qtable": "qtable",
+    "GreedyPolicy": "policy",
+    "compile_policy": "policy",
+    "load_policy": "policy",
+    "train": "q_learning_snake",
+    "evaluate": "evaluation",
+    "TrajectoryStore": "trajectory",
+    "TerminalRenderer": "terminal_renderer",
+    "CompiledPolicy": "snake.player",
+    "play": "snake.player",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'snake' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value   # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,58 @@
+# snake/__main__.py
+#
+#     python -m snake play --policy qtable|heuristic|human
+#     python -m snake train [q_learning_snake.py options]
+#     python -m snake eval  [evaluation.py options]
+#
+# Every command imports only its own modules, so `play` never loads the
+# training code, NumPy or pygame unless it needs them.
+
+import argparse
+import importlib
+import sys
+
+# command -> module whose main() handles the rest of the arguments
+FORWARDED = {
+    "train": ("q_learning_snake", "train a Q-table (see q_learning_snake.py --help)"),
+    "eval": ("evaluation", "evaluate policies (see evaluation.py --help)"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m snake",
+                                     description="Play, train and evaluate Snake agents.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    play = commands.add_parser("play", help="watch a policy play in the terminal, or play yourself")
+    play.add_argument("--policy", choices=["qtable", "heuristic", "human"], default="qtable")
+    play.add_argument("--policy-file", default=None,
+                      help="compiled policy for --policy qtable (default: q_policy.qpol)")
+    play.add_argument("--grid-size", type=int, default=None,
+                      help="board size (default: the policy's own, or 10)")
+    play.add_argument("--episodes", type=int, default=1)
+    play.add_argument("--max-steps", type=int, default=1000, help="step limit per episode")
+    play.add_argument("--fps", type=float, default=5, help="frames per second (0 = no limit)")
+    play.add_argument("--seed", type=int, default=None)
+    play.add_argument("--pygame", action="store_true",
+                      help="open the Pygame window instead (press C to switch HUMAN / AI / RL)")
+
+    for name, (_, help_text) in FORWARDED.items():
+        # no -h here: --help goes on to the script's own parser
+        commands.add_parser(name, help=help_text, add_help=False)
+
+    args, rest = parser.parse_known_args(argv)
+    if args.command in FORWARDED:
+        module, _ = FORWARDED[args.command]
+        sys.argv = [f"python -m snake {args.command}"] + rest
+        return importlib.import_module(module).main()
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+
+    from snake.player import play as run_play
+    run_play(args.policy, policy_file=args.policy_file, grid_size=args.grid_size,
+             episodes=args.episodes, max_steps=args.max_steps, fps=args.fps,
+             seed=args.seed, use_pygame=args.pygame)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# snake/player.py
+#
+# The `play` command. A trained agent plays from its compiled policy file
+# (policy.py), read as plain bytes, so starting a game imports neither the
+# training code nor NumPy; pygame is only imported with --pygame.
+
+import os
+import random
+import struct
+
+from snake_env import SnakeEnv, ACTIONS
+from relative_state import NUM_RELATIVE_STATES
+from snake_game import choose_env_action
+from terminal_renderer import TerminalRenderer
+
+POLICY_FILE = "q_policy.qpol"
+
+# the .qpol header of policy.py (POLICY_HEADER), repeated here so that
+# reading a policy doesn't import NumPy
+_POLICY_MAGIC = b"SNAKEPL\0"
+_POLICY_VERSION = 1
+_POLICY_HEADER = struct.Struct("<8sHHII44s")
+
+KEYS = {"w": "UP", "s": "DOWN", "a": "LEFT", "d": "RIGHT"}
+
+
+class CompiledPolicy:
+    """
+    A compiled policy file held as bytes: the action for a state is one
+    byte at the state's index. Same lookups as policy.GreedyPolicy, for
+    absolute (grid_size > 0) or relative (grid_size 0) states.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _POLICY_HEADER.size or not data.startswith(_POLICY_MAGIC):
+            raise ValueError(f"{path} is not a compiled policy file")
+        _, version, header_size, grid_size, num_states, actions = _POLICY_HEADER.unpack_from(data)
+        if version != _POLICY_VERSION:
+            raise ValueError(f"{path}: unsupported policy version {version}")
+        if actions.rstrip(b"\0").decode("ascii").split(",") != ACTIONS:
+            raise ValueError(f"{path}: action order does not match {ACTIONS}")
+        expected = NUM_RELATIVE_STATES if grid_size == 0 else grid_size ** 4
+        if num_states != expected or len(data) < header_size + num_states:
+            raise ValueError(f"{path}: bad number of states {num_states}")
+
+        self.grid_size = grid_size
+        self.state_encoding = "relative" if grid_size == 0 else "absolute"
+        self.table = memoryview(data)[header_size:header_size + num_states]
+
+    def action(self, state):
+        if self.grid_size == 0:
+            return ACTIONS[self.table[state]]
+        head_x, head_y, food_x, food_y = state
+        g = self.grid_size
+        return ACTIONS[self.table[((head_x * g + head_y) * g + food_x) * g + food_y]]
+
+
+def load_player_policy(path=None):
+    """
+    The compiled policy at path (default q_policy.qpol). If the default
+    file hasn't been built, the Q-table is compiled in memory instead,
+    which needs NumPy.
+    """
+    if path is None and not os.path.exists(POLICY_FILE):
+        from policy import load_policy
+        return load_policy()
+    return CompiledPolicy(path or POLICY_FILE)
+
+
+def play(agent="qtable", policy_file=None, grid_size=None, episodes=1, max_steps=1000,
+         fps=5, seed=None, use_pygame=False):
+    """
+    Play episodes in the terminal with agent "qtable", "heuristic" or
+    "human" (w/a/s/d + Enter).
+
+    returns: foods eaten per episode
+    """
+    if use_pygame:
+        import snake_pygame
+        snake_pygame.main(policy_path=policy_file or snake_pygame.RL_POLICY_FILE)
+        return []
+
+    policy = None
+    state_encoding = "absolute"
+    if agent == "qtable":
+        policy = load_player_policy(policy_file)
+        state_encoding = policy.state_encoding
+        if policy.grid_size:
+            if grid_size and grid_size != policy.grid_size:
+                raise ValueError(f"Policy was compiled for a {policy.grid_size}x"
+                                 f"{policy.grid_size} grid, not {grid_size}x{grid_size}")
+            grid_size = policy.grid_size
+
+    env = SnakeEnv(grid_size=grid_size or 10, state_encoding=state_encoding, seed=seed)
+    rng = random.Random(seed)
+    renderer = TerminalRenderer(env.grid_size, fps=0 if agent == "human" else fps)
+    scores = []
+    try:
+        for episode in range(episodes):
+            state = env.reset()
+            renderer.invalidate()
+            status = f"Episode {episode + 1}/{episodes}"
+            foods = 0
+            step = 0
+            while not env.done and step < max_steps:
+                renderer.draw(env.snake, env.food, status)
+                if agent == "human":
+                    key = renderer.input("Action (w=UP, s=DOWN, a=LEFT, d=RIGHT, q=quit): ")
+                    if key == "q":
+                        return scores
+                    action = KEYS.get(key)
+                    if action is None:
+                        status = "Invalid key!"
+                        continue
+                elif agent == "heuristic":
+                    action = choose_env_action(env, rng)
+                else:
+                    action = policy.action(state)
+
+                state, reward, done = env.step(action)
+                step += 1
+                if reward >= 1:
+                    foods += 1
+                status = f"Episode {episode + 1}/{episodes}  Action: {action}  Foods: {foods}"
+            renderer.draw(env.snake, env.food, status, force=True)
+            scores.append(foods)
+            result = "won" if env.won else "game over" if env.done else "step limit"
+            print(f"Episode {episode + 1}: {foods} foods in {step} steps ({result})")
+    finally:
+        renderer.close()
+    return scores
@@ -0,0 +1,133 @@
+# snake_body.py
+
+import random
+from collections import deque
+
+# random cells drawn before random_free_cell() falls back to scanning the
+# grid; by then the board is crowded and has few free cells to scan
+SAMPLE_TRIES = 16
+
+
+class SnakeBody:
+    """
+    Snake segments stored head-first in a deque, plus a set of occupied
+    cells, so that moving the head, dropping the tail and collision checks
+    are all O(1) no matter how long the snake is.
+
+    An occupancy grid with a one-cell wall border (a bytearray, 1 = wall
+    or body) answers "can the head move here?" with one index and no
+    bounds checks; see blocked(). The grid is built once: reset() only
+    clears the cells the old snake occupied, so starting a new game costs
+    O(snake length), not O(board size).
+
+    random_free_cell() depends only on the rng and on which cells are
+    occupied, never on the order the snake took them in, so a game
+    replayed from the same seed on a reused body places the same food.
+
+    Cells are (x, y) tuples. Lists like [x, y] are accepted when checking
+    membership, so the pygame code can keep using them for directions.
+    """
+
+    def __init__(self, cols, rows, segments=()):
+        self.cols = cols
+        self.rows = rows
+        self.segments = deque()
+        self.occupied = set()
+
+        self._stride = cols + 2
+        self.grid = bytearray(b"\x01" * self._stride)
+        for _ in range(rows):
+            self.grid += b"\x01" + bytes(cols) + b"\x01"
+        self.grid += b"\x01" * self._stride
+
+        for cell in segments:
+            self.push_tail(cell)
+
+    def reset(self, segments=()):
+        """Empty the board and lay out a new snake (head first)."""
+        grid, stride = self.grid, self._stride
+        for x, y in self.segments:
+            grid[(y + 1) * stride + x + 1] = 0
+        self.segments.clear()
+        self.occupied.clear()
+        for cell in segments:
+            self.push_tail(cell)
+
+    @property
+    def head(self):
+        return self.segments[0]
+
+    @property
+    def tail(self):
+        return self.segments[-1]
+
+    @property
+    def num_free(self):
+        return self.cols * self.rows - len(self.segments)
+
+    def push_head(self, cell):
+        """Add a new head segment."""
+        cell = tuple(cell)
+        self.segments.appendleft(cell)
+        self.occupied.add(cell)
+        self.grid[(cell[1] + 1) * self._stride + cell[0] + 1] = 1
+
+    def push_tail(self, cell):
+        """Add a segment behind the current tail (used to build a snake)."""
+        cell = tuple(cell)
+        self.segments.append(cell)
+        self.occupied.add(cell)
+        self.grid[(cell[1] + 1) * self._stride + cell[0] + 1] = 1
+
+    def pop_tail(self):
+        """Remove and return the tail segment."""
+        cell = self.segments.pop()
+        self.occupied.discard(cell)
+        self.grid[(cell[1] + 1) * self._stride + cell[0] + 1] = 0
+        return cell
+
+    def blocked(self, x, y):
+        """
+        True if (x, y) is a wall or part of the snake.
+
+        Valid for -1 <= x <= cols and -1 <= y <= rows, i.e. any neighbour
+        of a cell on the board.
+        """
+        return self.grid[(y + 1) * self._stride + x + 1] == 1
+
+    def random_free_cell(self, rng=random):
+        """Return a uniformly random free cell, or None if the board is full."""
+        free = self.num_free
+        if not free:
+            return None
+        grid, stride, cols = self.grid, self._stride, self.cols
+
+        # mostly empty board: draw cells until one is free
+        size = cols * self.rows
+        for _ in range(SAMPLE_TRIES):
+            y, x = divmod(rng.randrange(size), cols)
+            if not grid[(y + 1) * stride + x + 1]:
+                return (x, y)
+
+        # crowded board: the k-th free cell in row-major order (only the
+        # board's free cells are 0 in the grid, the border never is)
+        index = -1
+        for _ in range(rng.randrange(free) + 1):
+            index = grid.find(0, index + 1)
+        y, x = divmod(index, stride)
+        return (x - 1, y - 1)
+
+    def __contains__(self, cell):
+        return tuple(cell) in self.occupied
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    def __getitem__(self, index):
+        return self.segments[index]
+
+    def __repr__(self):
+        return f"SnakeBody({list(self.segments)})"
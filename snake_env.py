@@ -1,34 +1,84 @@
 import random
+from snake_body import SnakeBody
+from relative_state import encode_relative
+
+ACTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
 
 
 class SnakeEnv:
-    def __init__(self, grid_size=10):
+    """
+    state_encoding: "absolute" states are (head_x, head_y, food_x, food_y);
+                    "relative" states are the small integers of
+                    relative_state.encode_relative() (danger, heading and
+                    food direction), the same on any board size
+    seed: seeds the env's own RNG (food placement never touches the global
+          random module). reset(seed=...) places an episode's food from
+          that `episode_seed` alone, so the episode can be rebuilt from the
+          seed and its actions; a plain reset() keeps drawing food from the
+          env's RNG, which is cheaper than reseeding for every episode.
+    """
+
+    def __init__(self, grid_size=10, state_encoding="absolute", seed=None):
+        if state_encoding not in ("absolute", "relative"):
+            raise ValueError(f"Unknown state encoding: {state_encoding}")
         self.grid_size = grid_size
+        self.state_encoding = state_encoding
+        self.seeds = random.Random(seed)   # food, unless an episode is seeded
+        self._episode_rng = random.Random()
+        self.rng = self.seeds              # food placement in this episode
+        self.snake = SnakeBody(grid_size, grid_size)
         self.reset()
 
-    def reset(self):
-        """Start a new episode: place snake in the middle, spawn food."""
+    def seed(self, seed):
+        """Reseed the env; the next reset() starts the seeded sequence."""
+        self.seeds.seed(seed)
+
+    def reset(self, seed=None):
+        """
+        Start a new episode: place snake in the middle, spawn food.
+
+        seed: place this episode's food from this seed only (to record or
+              replay it); episode_seed is None for an unseeded episode
+        """
+        self.episode_seed = seed
+        if seed is None:
+            self.rng = self.seeds
+        else:
+            self._episode_rng.seed(seed)
+            self.rng = self._episode_rng
+
         x = self.grid_size // 2
         y = self.grid_size // 2
-        self.snake = [(x, y)]         
+        self.snake.reset([(x, y)])
         self.direction = "UP"
         self.done = False
+        self.won = False
 
-        self._spawn_food()
+        if not self._spawn_food():
+            # 1x1 board: the snake already fills it
+            self.done = True
+            self.won = True
         return self.get_state()
 
     def _spawn_food(self):
-        """Place food at a random empty cell (not on the snake)."""
-        while True:
-            fx = random.randint(0, self.grid_size - 1)
-            fy = random.randint(0, self.grid_size - 1)
-            if (fx, fy) not in self.snake:
-                self.food = (fx, fy)
-                break
+        """
+        Place food at a random empty cell (not on the snake).
+
+        Returns False if the snake fills the whole board. The food is then
+        left on the head so that get_state() still works.
+        """
+        cell = self.snake.random_free_cell(self.rng)
+        if cell is None:
+            self.food = self.snake.head
+            return False
+        self.food = cell
+        return True
 
     def get_state(self):
-        """Return state = (head_x, head_y, food_x, food_y)."""
-        head_x, head_y = self.snake[0]
+        """Return state = (head_x, head_y, food_x, food_y), or the relative state."""
+        if self.state_encoding == "relative":
+            return encode_relative(self.snake, self.direction, self.food)
+        head_x, head_y = self.snake.head
         food_x, food_y = self.food
         return (head_x, head_y, food_x, food_y)
 
@@ -43,7 +93,7 @@ class SnakeEnv:
         if self.done:
             raise ValueError("Game is over. Call reset() before step().")
 
-        head_x, head_y = self.snake[0]
+        head_x, head_y = self.snake.head
         if action == "UP":
             new_head = (head_x, head_y - 1)
         elif action == "DOWN":
@@ -64,32 +114,36 @@ class SnakeEnv:
             self.done = True
             reward = -1
             return self.get_state(), reward, self.done
-        self.snake.insert(0, new_head)   
+        self.snake.push_head(new_head)
+        self.direction = action
         if new_head == self.food:
-            reward = 1          
-            self._spawn_food()   
+            reward = 1
+            if not self._spawn_food():
+                # no empty cell left: the snake has won
+                self.done = True
+                self.won = True
         else:
             reward = 0
-            self.snake.pop()  
+            self.snake.pop_tail()
 
         next_state = self.get_state()
-        self.done = False
         return next_state, reward, self.done
     def render(self):
-        grid = [["." for _ in range(self.grid_size)] for _ in range(self.grid_size)]
-
-        # snake head is first element of the snake list
-        sx, sy = self.snake[0]
-        grid[sy][sx] = "S"
-
-        # food coordinates
+        """Print the board once (see terminal_renderer for animation)."""
+        g = self.grid_size
+        cells = bytearray(b"." * (g * g))
+        for x, y in self.snake:
+            cells[y * g + x] = ord("o")
+        # snake head is the first segment
+        sx, sy = self.snake.head
+        cells[sy * g + sx] = ord("S")
+
+        # food coordinates (the food sits on the head once the board is full)
         fx, fy = self.food
-        grid[fy][fx] = "F"
+        if (fx, fy) != (sx, sy):
+            cells[fy * g + fx] = ord("F")
 
         # print the grid to terminal
-        print("\n".join(" ".join(row) for row in grid))
+        rows = (" ".join(cells[y * g:(y + 1) * g].decode("ascii")) for y in range(g))
+        print("\n".join(rows))
         print("-" * 20)
-
-
-
-
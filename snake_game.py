@@ -0,0 +1,216 @@
+# snake_game.py
+#
+# Rules of the pygame Snake game, without any drawing, sound or pygame
+# import, so the game can be simulated headless as fast as possible.
+
+import random
+import time
+
+from snake_body import SnakeBody
+from relative_state import HEADINGS
+
+COLS, ROWS = 30, 30           # Board size (cells)
+
+
+def random_food_position(snake, rng=random):
+    """Return a random (x, y) cell not occupied by the snake (None if full)."""
+    return snake.random_free_cell(rng)
+
+
+class SnakeGame:
+    """
+    State of one game plus a fixed-size tick of the rules.
+
+    The renderer (or a headless runner) decides how many ticks to run;
+    tick() itself never waits or draws.
+
+    ai: callable (snake, food, current_direction) -> direction used by
+        ai_tick(), e.g. a pathfinding.PathPlanner; defaults to
+        choose_ai_direction
+    """
+
+    def __init__(self, cols=COLS, rows=ROWS, rng=random, ai=None):
+        self.cols = cols
+        self.rows = rows
+        self.rng = rng
+        self.ai = ai or self.greedy_direction
+        self.snake = SnakeBody(cols, rows)
+        self.reset()
+
+    def reset(self):
+        head_x = self.cols // 2
+        head_y = self.rows // 2
+        self.snake.reset([
+            (head_x, head_y),
+            (head_x - 1, head_y),
+            (head_x - 2, head_y),
+        ])
+        self.direction = [1, 0]  # moving right
+        self.food = random_food_position(self.snake, self.rng)
+        self.score = 0
+        self.ticks = 0
+        self.over = False
+        self.won = False
+
+    def tick(self):
+        """
+        Move the snake one cell in self.direction.
+
+        returns: "died", "ate", "won" or None
+        """
+        head_x, head_y = self.snake.head
+        new_head = (head_x + self.direction[0], head_y + self.direction[1])
+        self.ticks += 1
+
+        # Check collision with walls or self
+        if (
+            new_head[0] < 0 or new_head[0] >= self.cols or
+            new_head[1] < 0 or new_head[1] >= self.rows or
+            new_head in self.snake
+        ):
+            self.over = True
+            return "died"
+
+        self.snake.push_head(new_head)
+
+        # Check food
+        if new_head == self.food:
+            self.score += 1
+            self.food = random_food_position(self.snake, self.rng)
+            if self.food is None:
+                # Snake fills the whole board: nothing left to eat
+                self.over = True
+                self.won = True
+                return "won"
+            return "ate"
+
+        self.snake.pop_tail()
+        return None
+
+    def greedy_direction(self, snake, food, current_direction):
+        return choose_ai_direction(snake, food, current_direction,
+                                   self.cols, self.rows, self.rng)
+
+    def ai_tick(self):
+        """Let the AI pick the direction, then tick()."""
+        self.direction = self.ai(self.snake, self.food, self.direction)
+        return self.tick()
+
+
+# ---------- Simple "AI Brain" ----------
+
+def choose_ai_direction(snake, food, current_direction, cols=COLS, rows=ROWS, rng=random):
+    """
+    Very simple AI:
+    - Tries all 4 directions
+    - Ignores moves that hit wall or self
+    - Among safe moves, picks one that gets closer to the food
+    """
+    head_x, head_y = snake.head
+    fx, fy = food
+
+    # All possible directions: up, down, left, right
+    candidates = [
+        [0, -1],  # up
+        [0, 1],   # down
+        [-1, 0],  # left
+        [1, 0],   # right
+    ]
+
+    # Don't allow 180° turn (reverse)
+    opposite = [-current_direction[0], -current_direction[1]]
+
+    best_move = None
+    best_dist = None
+
+    for move in candidates:
+        if move == opposite:
+            continue  # skip direct reverse to avoid instant self-hit
+
+        nx = head_x + move[0]
+        ny = head_y + move[1]
+
+        # Check if out of bounds
+        if nx < 0 or nx >= cols or ny < 0 or ny >= rows:
+            continue
+
+        # Check collision with body
+        if (nx, ny) in snake:
+            continue
+
+        # Manhattan distance to food
+        dist = abs(nx - fx) + abs(ny - fy)
+
+        if best_move is None or dist < best_dist:
+            best_move = move
+            best_dist = dist
+
+    # If no safe "smart" move found, try any safe move
+    if best_move is None:
+        safe_moves = []
+        for move in candidates:
+            if move == opposite:
+                continue
+            nx = head_x + move[0]
+            ny = head_y + move[1]
+            if (
+                0 <= nx < cols and
+                0 <= ny < rows and
+                (nx, ny) not in snake
+            ):
+                safe_moves.append(move)
+        if safe_moves:
+            best_move = rng.choice(safe_moves)
+        else:
+            best_move = current_direction  # completely stuck, just keep going
+
+    return best_move
+
+
+_ACTION_FOR_MOVE = {move: action for action, move in HEADINGS.items()}
+
+
+def choose_env_action(env, rng=random):
+    """choose_ai_direction() for a SnakeEnv: returns an action name."""
+    g = env.grid_size
+    move = choose_ai_direction(env.snake, env.food, list(HEADINGS[env.direction]), g, g, rng)
+    return _ACTION_FOR_MOVE[tuple(move)]
+
+
+# ---------- Headless runs ----------
+
+def run_ai_games(games, seed=None, max_ticks=100_000, cols=COLS, rows=ROWS, ai=None):
+    """
+    Play AI games back to back with no rendering and no frame limit.
+
+    max_ticks caps a single game in case the AI loops without dying.
+    ai is as for SnakeGame (default choose_ai_direction).
+
+    returns: dict with the per-game "scores" and "ticks", the number of
+             games "won", and "seconds" / "ai_seconds" (time spent
+             choosing directions)
+    """
+    rng = random.Random(seed)
+    game = SnakeGame(cols, rows, rng, ai)
+    scores, ticks, won = [], [], 0
+    ai_seconds = 0.0
+    clock = time.perf_counter
+
+    start = clock()
+    for _ in range(games):
+        game.reset()
+        while not game.over and game.ticks < max_ticks:
+            t0 = clock()
+            game.direction = game.ai(game.snake, game.food, game.direction)
+            ai_seconds += clock() - t0
+            game.tick()
+        scores.append(game.score)
+        ticks.append(game.ticks)
+        won += game.won
+    return {
+        "scores": scores,
+        "ticks": ticks,
+        "won": won,
+        "seconds": clock() - start,
+        "ai_seconds": ai_seconds,
+    }
@@ -1,15 +1,23 @@
+import argparse
 import pygame
 import sys
-import random
 import os
+from collections import OrderedDict
+
+from snake_game import COLS, ROWS, SnakeGame, run_ai_games
+from pathfinding import PathPlanner
+from policy import GreedyPolicy
+from relative_state import encode_relative
+from trajectory import TrajectoryStore, Replayer, OUTCOMES
 
 # ---------- Game Settings ----------
-WIDTH, HEIGHT = 600, 600      # Window size (pixels)
 CELL_SIZE = 20                # Size of one grid cell
-COLS = WIDTH // CELL_SIZE
-ROWS = HEIGHT // CELL_SIZE
+WIDTH, HEIGHT = COLS * CELL_SIZE, ROWS * CELL_SIZE   # Window size (pixels)
 
-SNAKE_SPEED = 12              # Frames per second (higher = smoother)
+SNAKE_SPEED = 12              # Game ticks per second (higher = faster snake)
+FPS = 60                      # Rendered frames per second (higher = smoother)
+MAX_TICKS_PER_FRAME = 5       # Catch-up limit after a slow frame
+AI_BUDGET = 0.5 / FPS         # Seconds the path AI may plan per tick
 
 # Colors
 BLACK  = (0, 0, 0)
@@ -25,14 +33,6 @@ HIGH_SCORE_FILE = "highscore.txt"
 
 # ---------- Helper Functions ----------
 
-def random_food_position(snake):
-    """Return a random (x, y) cell not occupied by the snake."""
-    while True:
-        x = random.randint(0, COLS - 1)
-        y = random.randint(0, ROWS - 1)
-        if [x, y] not in snake:
-            return [x, y]
-
 def draw_grid(surface):
     # Very subtle grid for a smoother look
     for x in range(0, WIDTH, CELL_SIZE):
@@ -40,43 +40,44 @@ def draw_grid(surface):
     for y in range(0, HEIGHT, CELL_SIZE):
         pygame.draw.line(surface, (25, 25, 25), (0, y), (WIDTH, y))
 
-def draw_snake(surface, snake):
-    for i, (x, y) in enumerate(snake):
-        px = x * CELL_SIZE
-        py = y * CELL_SIZE
-        rect = pygame.Rect(px, py, CELL_SIZE, CELL_SIZE)
-
-        # Outer darker body (border)
-        pygame.draw.rect(surface, GREEN_DARK, rect, border_radius=6)
-
-        # Inner lighter "skin"
-        inner = rect.inflate(-6, -6)
-        pygame.draw.rect(surface, GREEN_LIGHT, inner, border_radius=8)
-
-        if i == 0:
-            # Head overlay
-            head_inner = rect.inflate(-4, -4)
-            pygame.draw.rect(surface, GREEN, head_inner, border_radius=10)
-
-            # Eyes
-            eye_radius = 2
-            eye_offset_x = CELL_SIZE // 4
-            eye_offset_y = CELL_SIZE // 4
-
-            pygame.draw.circle(
-                surface,
-                WHITE,
-                (px + CELL_SIZE - eye_offset_x, py + eye_offset_y),
-                eye_radius
-            )
-            pygame.draw.circle(
-                surface,
-                WHITE,
-                (px + CELL_SIZE - eye_offset_x, py + CELL_SIZE - eye_offset_y),
-                eye_radius
-            )
+def paint_segment(surface, x, y, head=False):
+    """Vector-draw one snake segment (used to build the sprite atlas)."""
+    px = x * CELL_SIZE
+    py = y * CELL_SIZE
+    rect = pygame.Rect(px, py, CELL_SIZE, CELL_SIZE)
 
-def draw_food(surface, food):
+    # Outer darker body (border)
+    pygame.draw.rect(surface, GREEN_DARK, rect, border_radius=6)
+
+    # Inner lighter "skin"
+    inner = rect.inflate(-6, -6)
+    pygame.draw.rect(surface, GREEN_LIGHT, inner, border_radius=8)
+
+    if head:
+        # Head overlay
+        head_inner = rect.inflate(-4, -4)
+        pygame.draw.rect(surface, GREEN, head_inner, border_radius=10)
+
+        # Eyes
+        eye_radius = 2
+        eye_offset_x = CELL_SIZE // 4
+        eye_offset_y = CELL_SIZE // 4
+
+        pygame.draw.circle(
+            surface,
+            WHITE,
+            (px + CELL_SIZE - eye_offset_x, py + eye_offset_y),
+            eye_radius
+        )
+        pygame.draw.circle(
+            surface,
+            WHITE,
+            (px + CELL_SIZE - eye_offset_x, py + CELL_SIZE - eye_offset_y),
+            eye_radius
+        )
+
+def paint_food(surface, food):
+    """Vector-draw the food (used to build the sprite atlas)."""
     x, y = food
     px = x * CELL_SIZE
     py = y * CELL_SIZE
@@ -89,12 +90,226 @@ def draw_food(surface, food):
     highlight = rect.inflate(-10, -10)
     pygame.draw.rect(surface, (255, 120, 120), highlight, border_radius=10)
 
+class SpriteAtlas:
+    """
+    Snake and food tiles pre-rendered once for a cell size.
+
+    The tiles are drawn with the vector functions above into one
+    transparent strip: body, head facing right/up/left/down, food. The
+    right-facing head is exactly the original head; the others are
+    90-degree rotations of it. Frames are then drawn with a single
+    Surface.blits() call instead of several shape draws per segment.
+    """
+
+    BODY, HEAD_RIGHT, HEAD_UP, HEAD_LEFT, HEAD_DOWN, FOOD = range(6)
+
+    # (head - neck) direction -> head tile
+    HEAD_TILES = {(1, 0): HEAD_RIGHT, (0, -1): HEAD_UP, (-1, 0): HEAD_LEFT, (0, 1): HEAD_DOWN}
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.image = pygame.Surface((6 * cell_size, cell_size), pygame.SRCALPHA)
+        self.areas = [pygame.Rect(i * cell_size, 0, cell_size, cell_size) for i in range(6)]
+
+        def tile():
+            return pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
+
+        body, head, food = tile(), tile(), tile()
+        paint_segment(body, 0, 0)
+        paint_segment(head, 0, 0, head=True)
+        paint_food(food, (0, 0))
+
+        self.image.blit(body, self.areas[self.BODY])
+        self.image.blit(head, self.areas[self.HEAD_RIGHT])
+        for index, angle in ((self.HEAD_UP, 90), (self.HEAD_LEFT, 180), (self.HEAD_DOWN, 270)):
+            self.image.blit(pygame.transform.rotate(head, angle), self.areas[index])
+        self.image.blit(food, self.areas[self.FOOD])
+
+    def head_tile(self, snake):
+        """Head tile facing the way the snake last moved (right if unknown)."""
+        if len(snake) < 2:
+            return self.HEAD_RIGHT
+        (hx, hy), (nx, ny) = snake[0], snake[1]
+        return self.HEAD_TILES.get((hx - nx, hy - ny), self.HEAD_RIGHT)
+
+    def blit(self, surface, cell, tile):
+        size = self.cell_size
+        surface.blit(self.image, (cell[0] * size, cell[1] * size), self.areas[tile])
+
+    def snake_blits(self, snake):
+        """(image, position, area) triples for Surface.blits()."""
+        size = self.cell_size
+        image, body = self.image, self.areas[self.BODY]
+        blits = [(image, (x * size, y * size), body) for x, y in snake]
+        if blits:
+            blits[0] = (image, blits[0][1], self.areas[self.head_tile(snake)])
+        return blits
+
+_ATLASES = {}
+
+def get_atlas():
+    """The sprite atlas for the current CELL_SIZE (built on first use)."""
+    atlas = _ATLASES.get(CELL_SIZE)
+    if atlas is None:
+        atlas = _ATLASES[CELL_SIZE] = SpriteAtlas(CELL_SIZE)
+    return atlas
+
+def draw_snake(surface, snake):
+    surface.blits(get_atlas().snake_blits(snake), doreturn=False)
+
+def draw_segment(surface, snake, cell):
+    """Draw the segment of snake at cell (head or body)."""
+    atlas = get_atlas()
+    tile = atlas.head_tile(snake) if cell == snake.head else atlas.BODY
+    atlas.blit(surface, cell, tile)
+
+def draw_food(surface, food):
+    get_atlas().blit(surface, food, SpriteAtlas.FOOD)
+
+class TextCache:
+    """
+    LRU caches for fonts and rendered text.
+
+    Looking up a system font and rendering text are among the slowest things
+    in a frame, and the same labels are drawn every frame. Fonts are keyed
+    by (size, bold) and rendered surfaces by (text, size, color, bold), so a
+    label like the score is only rendered again when its text changes.
+    """
+
+    def __init__(self, max_fonts=16, max_surfaces=256):
+        self.max_fonts = max_fonts
+        self.max_surfaces = max_surfaces
+        self.fonts = OrderedDict()
+        self.surfaces = OrderedDict()
+
+    @staticmethod
+    def _lookup(cache, key):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    @staticmethod
+    def _store(cache, key, value, limit):
+        cache[key] = value
+        if len(cache) > limit:
+            cache.popitem(last=False)   # drop the least recently used
+        return value
+
+    def font(self, size, bold=True):
+        key = (size, bold)
+        font = self._lookup(self.fonts, key)
+        if font is None:
+            font = self._store(self.fonts, key, pygame.font.SysFont("arial", size, bold=bold),
+                               self.max_fonts)
+        return font
+
+    def render(self, text, size, color, bold=True):
+        key = (text, size, color, bold)
+        surface = self._lookup(self.surfaces, key)
+        if surface is None:
+            surface = self._store(self.surfaces, key,
+                                  self.font(size, bold).render(text, True, color),
+                                  self.max_surfaces)
+        return surface
+
+    def clear(self):
+        """Forget everything (fonts are invalid after pygame.quit())."""
+        self.fonts.clear()
+        self.surfaces.clear()
+
+
+TEXT_CACHE = TextCache()
+
 def show_text(surface, text, size, color, center, bold=True):
-    font = pygame.font.SysFont("arial", size, bold=bold)
-    render = font.render(text, True, color)
+    render = TEXT_CACHE.render(text, size, color, bold)
     rect = render.get_rect(center=center)
     surface.blit(render, rect)
 
+def draw_playfield_objects(surface, snake, food):
+    draw_snake(surface, snake)
+    if food is not None:
+        draw_food(surface, food)
+
+def draw_playfield(surface, snake, food, score, high_score, control_mode):
+    """Draw one in-game frame: grid, snake, food and the score bar."""
+    # Background grid + snake + food
+    draw_grid(surface)
+    draw_playfield_objects(surface, snake, food)
+
+    draw_score_bar(surface, score, high_score, control_mode)
+
+SCORE_BAR = pygame.Rect(0, 0, WIDTH, 40)
+
+def draw_score_bar(surface, score, high_score, control_mode):
+    # Top bar for score, high score, mode
+    pygame.draw.rect(surface, (15, 15, 15), SCORE_BAR)
+    show_text(surface, f"Score: {score}", 22, WHITE, (80, 20), bold=True)
+    show_text(surface, f"High: {high_score}", 22, YELLOW, (WIDTH - 80, 20), bold=True)
+    show_text(surface, f"Mode: {control_mode}", 20, WHITE, (WIDTH // 2, 20), bold=True)
+
+class DirtyRenderer:
+    """
+    Incremental in-game renderer.
+
+    The grid is drawn once into a background surface. After the first full
+    frame, only the cells that changed since the last frame (new head, old
+    head, vacated tail, old and new food) are restored from the background,
+    redrawn and pushed with pygame.display.update(rects). The score bar is
+    redrawn only when its text changes or a changed cell lies under it.
+
+    Call invalidate() whenever something else was drawn over the screen
+    (menu, game over overlay) so the next frame is drawn in full.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        self.background.fill(BLACK)
+        draw_grid(self.background)
+        self.invalidate()
+
+    def invalidate(self):
+        self.cells = None   # cells occupied by the snake in the last frame
+        self.head = None
+        self.food = None
+        self.bar = None
+
+    def draw(self, snake, food, score, high_score, control_mode):
+        bar = (score, high_score, control_mode)
+        screen = self.screen
+
+        if self.cells is None:
+            screen.blit(self.background, (0, 0))
+            draw_playfield_objects(screen, snake, food)
+            draw_score_bar(screen, *bar)
+            pygame.display.flip()
+        else:
+            changed = self.cells.symmetric_difference(snake.occupied)
+            changed.update((self.head, snake.head, self.food, food))
+            changed.discard(None)
+
+            rects = []
+            for cell in changed:
+                rect = pygame.Rect(cell[0] * CELL_SIZE, cell[1] * CELL_SIZE,
+                                   CELL_SIZE, CELL_SIZE)
+                screen.blit(self.background, rect, rect)
+                if cell in snake.occupied:
+                    draw_segment(screen, snake, cell)
+                elif cell == food:
+                    draw_food(screen, food)
+                rects.append(rect)
+
+            if bar != self.bar or SCORE_BAR.collidelist(rects) != -1:
+                draw_score_bar(screen, *bar)
+                rects.append(SCORE_BAR)
+            pygame.display.update(rects)
+
+        self.cells = set(snake.occupied)
+        self.head = snake.head
+        self.food = food
+        self.bar = bar
+
 def load_sound(name):
     """Try to load a sound. If file not found, return None (silent mode)."""
     path = os.path.join(os.path.dirname(__file__), name)
@@ -123,83 +338,77 @@ def save_high_score(score):
     except Exception:
         pass
 
-# ---------- Simple "AI Brain" ----------
-
-def choose_ai_direction(snake, food, current_direction):
-    """
-    Very simple AI:
-    - Tries all 4 directions
-    - Ignores moves that hit wall or self
-    - Among safe moves, picks one that gets closer to the food
-    """
-    head_x, head_y = snake[0]
-    fx, fy = food
-
-    # All possible directions: up, down, left, right
-    candidates = [
-        [0, -1],  # up
-        [0, 1],   # down
-        [-1, 0],  # left
-        [1, 0],   # right
-    ]
+# ---------- RL policy ----------
 
-    # Don't allow 180° turn (reverse)
-    opposite = [-current_direction[0], -current_direction[1]]
+RL_POLICY_FILE = "q_policy_relative.qpol"   # relative states: fits any board
 
-    best_move = None
-    best_dist = None
+RL_DIRECTIONS = {"UP": [0, -1], "DOWN": [0, 1], "LEFT": [-1, 0], "RIGHT": [1, 0]}
+RL_HEADINGS = {tuple(move): name for name, move in RL_DIRECTIONS.items()}
 
-    for move in candidates:
-        if move == opposite:
-            continue  # skip direct reverse to avoid instant self-hit
+def load_rl_policy(path):
+    """
+    Load a compiled policy for the "RL" control mode.
 
-        nx = head_x + move[0]
-        ny = head_y + move[1]
+    Returns None (RL mode unavailable) if the file is missing or was built
+    for a different board size than COLS x ROWS. Relative-state policies
+    work on any board.
+    """
+    try:
+        policy = GreedyPolicy.load(path)
+    except (OSError, ValueError) as e:
+        print(f"RL mode disabled: {e}")
+        return None
+    if policy.state_encoding == "absolute" and (policy.grid_size != COLS or
+                                                 policy.grid_size != ROWS):
+        print(f"RL mode disabled: {path} is for a {policy.grid_size}x{policy.grid_size} "
+              f"board, this one is {COLS}x{ROWS}")
+        return None
+    return policy
+
+def rl_direction(policy, snake, food, current_direction):
+    """Direction chosen by the compiled Q-table policy (no 180° turns)."""
+    if policy.state_encoding == "relative":
+        heading = RL_HEADINGS[tuple(current_direction)]
+        state = encode_relative(snake, heading, food)
+    else:
+        head_x, head_y = snake.head
+        state = (head_x, head_y, food[0], food[1])
+    move = RL_DIRECTIONS[policy.action(state)]
+    if move == [-current_direction[0], -current_direction[1]]:
+        return current_direction
+    return move
 
-        # Check if out of bounds
-        if nx < 0 or nx >= COLS or ny < 0 or ny >= ROWS:
-            continue
+# ---------- Main Game Loop ----------
 
-        # Check collision with body
-        if [nx, ny] in snake:
-            continue
+def make_ai(name, budget=None):
+    """
+    AI for the "AI" control mode: "path" (PathPlanner) or "greedy".
 
-        # Manhattan distance to food
-        dist = abs(nx - fx) + abs(ny - fy)
-
-        if best_move is None or dist < best_dist:
-            best_move = move
-            best_dist = dist
-
-    # If no safe "smart" move found, try any safe move
-    if best_move is None:
-        safe_moves = []
-        for move in candidates:
-            if move == opposite:
-                continue
-            nx = head_x + move[0]
-            ny = head_y + move[1]
-            if (
-                0 <= nx < COLS and
-                0 <= ny < ROWS and
-                [nx, ny] not in snake
-            ):
-                safe_moves.append(move)
-        if safe_moves:
-            best_move = random.choice(safe_moves)
-        else:
-            best_move = current_direction  # completely stuck, just keep going
+    budget: seconds the path AI may plan per tick (see PathPlanner)
+    """
+    if name == "path":
+        return PathPlanner(COLS, ROWS, budget)
+    return None  # SnakeGame falls back to choose_ai_direction
 
-    return best_move
+def main(render_mode="full", ticks_per_frame=None, fps=FPS, ai="greedy", policy_path=RL_POLICY_FILE):
+    """
+    Run the game.
 
-# ---------- Main Game Loop ----------
+    The game advances in fixed ticks (SNAKE_SPEED per second) independent of
+    the frame rate. With ticks_per_frame set, exactly that many ticks run per
+    rendered frame instead (fast-forward, e.g. to watch the AI).
 
-def main():
+    render_mode: "full" redraws and flips the whole window every frame,
+                 "dirty" only redraws and updates the cells that changed
+    ai: "path" plans a path to the food, "greedy" uses choose_ai_direction
+    policy_path: compiled Q-table policy for the "RL" control mode
+    """
     pygame.init()
     pygame.mixer.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Snake RL Game")
     clock = pygame.time.Clock()
+    dirty = DirtyRenderer(screen) if render_mode == "dirty" else None
 
     # Sounds (optional – game works even if files are missing)
     eat_sound = load_sound("eat_drink.wav")
@@ -208,34 +417,21 @@ def main():
     # Game states: "MENU", "PLAYING", "GAME_OVER"
     state = "MENU"
 
-    score = 0
     high_score = load_high_score()
 
-    # control_mode: "HUMAN" or "AI"
+    # control_mode: "HUMAN", "AI" or "RL" (only if a matching policy loads)
+    policy = load_rl_policy(policy_path)
+    control_modes = ["HUMAN", "AI"] + (["RL"] if policy is not None else [])
     control_mode = "HUMAN"
 
-    # Snake + game variables (will be reset when starting game)
-    snake = []
-    direction = [1, 0]
-    food = [0, 0]
-
-    def reset_game():
-        nonlocal snake, direction, food, score
-        head_x = COLS // 2
-        head_y = ROWS // 2
-        snake = [
-            [head_x, head_y],
-            [head_x - 1, head_y],
-            [head_x - 2, head_y],
-        ]
-        direction = [1, 0]  # moving right
-        food = random_food_position(snake)
-        score = 0
-
-    reset_game()
+    game = SnakeGame(COLS, ROWS, ai=make_ai(ai, AI_BUDGET))
+    tick_length = 1.0 / SNAKE_SPEED
+    accumulator = 0.0
 
     running = True
     while running:
+        elapsed = clock.tick(fps) / 1000.0
+
         # ----- Events -----
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -245,86 +441,82 @@ def main():
                 if event.key == pygame.K_ESCAPE:
                     running = False
 
-                # Toggle control mode with C key
+                # Cycle control mode with C key
                 if event.key == pygame.K_c:
-                    control_mode = "AI" if control_mode == "HUMAN" else "HUMAN"
+                    next_mode = control_modes.index(control_mode) + 1
+                    control_mode = control_modes[next_mode % len(control_modes)]
 
                 if state == "MENU":
                     if event.key == pygame.K_SPACE:
                         state = "PLAYING"
+                        accumulator = 0.0
 
                 elif state == "PLAYING" and control_mode == "HUMAN":
                     # Movement controls (no 180° turn)
+                    direction = game.direction
                     if event.key in (pygame.K_UP, pygame.K_w) and direction != [0, 1]:
-                        direction = [0, -1]
+                        game.direction = [0, -1]
                     elif event.key in (pygame.K_DOWN, pygame.K_s) and direction != [0, -1]:
-                        direction = [0, 1]
+                        game.direction = [0, 1]
                     elif event.key in (pygame.K_LEFT, pygame.K_a) and direction != [1, 0]:
-                        direction = [-1, 0]
+                        game.direction = [-1, 0]
                     elif event.key in (pygame.K_RIGHT, pygame.K_d) and direction != [-1, 0]:
-                        direction = [1, 0]
+                        game.direction = [1, 0]
 
                 elif state == "GAME_OVER":
                     if event.key == pygame.K_SPACE:
-                        reset_game()
+                        game.reset()
                         state = "PLAYING"
+                        accumulator = 0.0
                     elif event.key == pygame.K_m:
-                        reset_game()
+                        game.reset()
                         state = "MENU"
 
-        # ----- Update -----
+        # ----- Update (fixed timestep) -----
         if state == "PLAYING":
-            # If AI mode, choose direction automatically each frame
-            if control_mode == "AI":
-                direction = choose_ai_direction(snake, food, direction)
-
-            head_x, head_y = snake[0]
-            new_head = [head_x + direction[0], head_y + direction[1]]
-
-            # Check collision with walls or self
-            if (
-                new_head[0] < 0 or new_head[0] >= COLS or
-                new_head[1] < 0 or new_head[1] >= ROWS or
-                new_head in snake
-            ):
-                state = "GAME_OVER"
-                save_high_score(score)
-                high_score = load_high_score()
-                if game_over_sound is not None:
-                    game_over_sound.play()
+            if ticks_per_frame:
+                ticks = ticks_per_frame
             else:
-                snake.insert(0, new_head)
-
-                # Check food
-                if new_head == food:
-                    score += 1
-                    if eat_sound is not None:
-                        eat_sound.play()
-                    food = random_food_position(snake)
-                else:
-                    snake.pop()
+                accumulator += elapsed
+                ticks = min(int(accumulator / tick_length), MAX_TICKS_PER_FRAME)
+                accumulator = min(accumulator - ticks * tick_length, tick_length)
+
+            for _ in range(ticks):
+                # If AI / RL mode, choose direction automatically each tick
+                if control_mode == "RL":
+                    game.direction = rl_direction(policy, game.snake, game.food, game.direction)
+                result = game.ai_tick() if control_mode == "AI" else game.tick()
+
+                if result == "ate" and eat_sound is not None:
+                    eat_sound.play()
+                if game.over:
+                    state = "GAME_OVER"
+                    save_high_score(game.score)
+                    high_score = load_high_score()
+                    if result == "died" and game_over_sound is not None:
+                        game_over_sound.play()
+                    break
 
         # ----- Draw -----
+        snake, food, score = game.snake, game.food, game.score
+
+        if dirty is not None and state == "PLAYING":
+            dirty.draw(snake, food, score, high_score, control_mode)
+            continue
+        if dirty is not None:
+            dirty.invalidate()
+
         screen.fill(BLACK)
 
         if state == "MENU":
             show_text(screen, "SNAKE RL", 54, GREEN_LIGHT, (WIDTH // 2, HEIGHT // 2 - 80))
             show_text(screen, "Use ARROWS or WASD to move", 24, WHITE, (WIDTH // 2, HEIGHT // 2))
             show_text(screen, "Press SPACE to start", 24, YELLOW, (WIDTH // 2, HEIGHT // 2 + 40))
-            show_text(screen, "Press C to toggle HUMAN / AI", 22, WHITE, (WIDTH // 2, HEIGHT // 2 + 80))
+            show_text(screen, f"Press C to toggle {' / '.join(control_modes)}", 22, WHITE, (WIDTH // 2, HEIGHT // 2 + 80))
             show_text(screen, f"High Score: {high_score}", 24, GREEN_LIGHT, (WIDTH // 2, HEIGHT // 2 + 120))
 
         elif state in ("PLAYING", "GAME_OVER"):
-            # Background grid + snake + food
-            draw_grid(screen)
-            draw_snake(screen, snake)
-            draw_food(screen, food)
-
-            # Top bar for score, high score, mode
-            pygame.draw.rect(screen, (15, 15, 15), (0, 0, WIDTH, 40))
-            show_text(screen, f"Score: {score}", 22, WHITE, (80, 20), bold=True)
-            show_text(screen, f"High: {high_score}", 22, YELLOW, (WIDTH - 80, 20), bold=True)
-            show_text(screen, f"Mode: {control_mode}", 20, WHITE, (WIDTH // 2, 20), bold=True)
+            draw_playfield(screen, snake, food, score, high_score, control_mode)
 
             if state == "GAME_OVER":
                 # Dark overlay
@@ -332,15 +524,139 @@ def main():
                 overlay.fill((0, 0, 0, 160))
                 screen.blit(overlay, (0, 0))
 
-                show_text(screen, "GAME OVER", 48, RED, (WIDTH // 2, HEIGHT // 2 - 40))
+                if game.won:
+                    show_text(screen, "YOU WIN", 48, GREEN_LIGHT, (WIDTH // 2, HEIGHT // 2 - 40))
+                else:
+                    show_text(screen, "GAME OVER", 48, RED, (WIDTH // 2, HEIGHT // 2 - 40))
                 show_text(screen, f"Final Score: {score}", 28, WHITE, (WIDTH // 2, HEIGHT // 2))
                 show_text(screen, "SPACE = Restart   M = Menu", 22, YELLOW, (WIDTH // 2, HEIGHT // 2 + 40))
 
         pygame.display.flip()
-        clock.tick(SNAKE_SPEED)
 
+    TEXT_CACHE.clear()
     pygame.quit()
     sys.exit()
 
+def run_replay(store_path, episode=None, step=0, ticks_per_frame=None, fps=FPS):
+    """
+    Show a recorded episode from a trajectory store (trajectory.py).
+
+    episode defaults to the store's best by foods; the board is scaled to
+    fill the window. SPACE pauses, LEFT / RIGHT step one move back or
+    forward, PAGE UP / PAGE DOWN jump 50 moves and HOME restarts. Jumps
+    fast-forward the SnakeEnv without drawing the skipped steps.
+    """
+    global CELL_SIZE
+    store = TrajectoryStore(store_path)
+    if episode is None:
+        episode = int(store.ranked("foods", 1)[0])
+    replay = Replayer(store, episode)
+    replay.seek(step)
+    CELL_SIZE = min(WIDTH, HEIGHT) // replay.env.grid_size
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Snake RL Replay #{episode}")
+    clock = pygame.time.Clock()
+    tick_length = 1.0 / SNAKE_SPEED
+    accumulator = 0.0
+    paused = False
+
+    running = True
+    while running:
+        elapsed = clock.tick(fps) / 1000.0
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    replay.seek(replay.position + 1)
+                elif event.key == pygame.K_LEFT:
+                    replay.seek(replay.position - 1)
+                elif event.key == pygame.K_PAGEDOWN:
+                    replay.seek(replay.position + 50)
+                elif event.key == pygame.K_PAGEUP:
+                    replay.seek(replay.position - 50)
+                elif event.key == pygame.K_HOME:
+                    replay.rewind()
+
+        if not paused and not replay.finished:
+            if ticks_per_frame:
+                ticks = ticks_per_frame
+            else:
+                accumulator += elapsed
+                ticks = min(int(accumulator / tick_length), MAX_TICKS_PER_FRAME)
+                accumulator = min(accumulator - ticks * tick_length, tick_length)
+            replay.seek(replay.position + ticks)
+
+        screen.fill(BLACK)
+        label = f"REPLAY {replay.position}/{len(replay)}" + (" (paused)" if paused else "")
+        draw_playfield(screen, replay.env.snake, replay.env.food, replay.foods,
+                       int(replay.record["foods"]), label)
+        if replay.finished:
+            outcome = OUTCOMES[replay.record["outcome"]].upper()
+            show_text(screen, outcome, 36, YELLOW, (WIDTH // 2, HEIGHT // 2))
+            show_text(screen, "HOME = Restart   ESC = Quit", 22, WHITE,
+                      (WIDTH // 2, HEIGHT // 2 + 40))
+        pygame.display.flip()
+
+    TEXT_CACHE.clear()
+    pygame.quit()
+
+def run_headless(games, seed=None, max_ticks=100_000, ai="greedy"):
+    """
+    Play AI games at full speed with no window and no sound, and print the
+    scores. Uses the SDL dummy drivers so nothing is opened even if pygame
+    gets initialised.
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+    results = run_ai_games(games, seed=seed, max_ticks=max_ticks, ai=make_ai(ai))
+    scores, ticks = results["scores"], results["ticks"]
+    total_ticks = sum(ticks)
+
+    print(f"=== HEADLESS {ai.upper()} AI ({games} games, {COLS}x{ROWS}) ===")
+    print(f"Average score: {sum(scores) / games:.2f}  "
+          f"(min {min(scores)}, max {max(scores)}, won {results['won']})")
+    print(f"Average ticks per game: {total_ticks / games:.1f}")
+    print(f"Time: {results['seconds']:.2f}s ({total_ticks / results['seconds']:,.0f} ticks/sec)")
+    print(f"AI: {results['ai_seconds'] / total_ticks * 1e6:.2f} us per tick")
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Snake game (human / AI).")
+    parser.add_argument("--render", choices=["full", "dirty"], default="full",
+                        help="dirty = only redraw the cells that changed each frame")
+    parser.add_argument("--fps", type=int, default=FPS, help="rendered frames per second")
+    parser.add_argument("--ticks-per-frame", type=int, default=None, metavar="N",
+                        help="run N game ticks per frame instead of SNAKE_SPEED per second")
+    parser.add_argument("--headless", action="store_true",
+                        help="play AI games at full speed without a window and print scores")
+    parser.add_argument("--ai", choices=["path", "greedy"], default="greedy",
+                        help="path = BFS planner, greedy = one-step lookahead")
+    parser.add_argument("--policy", default=RL_POLICY_FILE,
+                        help="compiled policy (policy.py) for the RL control mode")
+    parser.add_argument("--games", type=int, default=100, help="games to play with --headless")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-ticks", type=int, default=100_000,
+                        help="tick limit per game with --headless")
+    parser.add_argument("--replay", metavar="DIR",
+                        help="watch a recorded episode from this trajectory store")
+    parser.add_argument("--episode", type=int, default=None,
+                        help="episode to replay (default: the highest score)")
+    parser.add_argument("--step", type=int, default=0, help="start the replay at this step")
+    args = parser.parse_args()
+
+    if args.replay:
+        run_replay(args.replay, episode=args.episode, step=args.step,
+                   ticks_per_frame=args.ticks_per_frame, fps=args.fps)
+    elif args.headless:
+        run_headless(args.games, seed=args.seed, max_ticks=args.max_ticks, ai=args.ai)
+    else:
+        main(render_mode=args.render, ticks_per_frame=args.ticks_per_frame, fps=args.fps,
+             ai=args.ai, policy_path=args.policy)
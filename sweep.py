@@ -0,0 +1,248 @@
+# sweep.py
+#
+# Hyperparameter sweep for q_learning_snake.py with successive halving.
+#
+# Every configuration of the search space is trained for a small number of
+# episodes; only the best 1/eta of them are trained further, to eta times
+# as many episodes, and so on until the full budget. Training continues
+# from each configuration's own checkpoint, so a promoted configuration
+# never repeats the episodes it already ran.
+#
+# The sweep directory holds:
+#   sweep.json      the search space and budgets (checked on resume)
+#   results.jsonl   one line per finished (configuration, rung)
+#   config-N/       checkpoint of configuration N (see checkpoint.py)
+# Rerunning the same command resumes an interrupted sweep.
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+
+import q_learning_snake as ql
+from snake_env import SnakeEnv
+from checkpoint import Checkpointer, load_checkpoint
+from evaluation import play_episodes
+from policy import compile_policy
+from seeding import worker_seeds
+
+SPACE_FILE = "sweep.json"
+RESULTS_FILE = "results.jsonl"
+PARAMS = ("alpha", "gamma", "epsilon", "epsilon_decay")
+
+
+def search_space(grid, samples=None, seed=None):
+    """
+    All combinations of the values in grid ({param: [values]}), or
+    `samples` of them drawn at random without replacement.
+    """
+    names = list(grid)
+    configs = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    if samples is not None and samples < len(configs):
+        configs = random.Random(seed).sample(configs, samples)
+    return configs
+
+
+def budgets(min_episodes, max_episodes, eta):
+    """Episodes per rung: min_episodes * eta**r, ending at max_episodes."""
+    rungs = [min_episodes]
+    while rungs[-1] < max_episodes:
+        rungs.append(min(rungs[-1] * eta, max_episodes))
+    return rungs
+
+
+def _train_and_score(task):
+    """
+    Train one configuration up to `episodes` from its checkpoint, then play
+    the greedy policy for `eval_episodes` episodes (no exploration).
+    """
+    index, config, episodes, space, directory, seed = task
+    start = time.perf_counter()
+    checkpoint_dir = os.path.join(directory, f"config-{index}")
+    env = SnakeEnv(grid_size=space["grid_size"], state_encoding=space["state"])
+
+    Q = None
+    start_episode = 0
+    restored = load_checkpoint(checkpoint_dir)
+    if restored is not None:
+        Q, start_episode, state = restored
+        ql.restore_random_state(state, env)
+        seed = None
+    checkpointer = Checkpointer(checkpoint_dir, every=0)
+    try:
+        Q, _ = ql.train(
+            env, episodes, config["alpha"], config["gamma"], config["epsilon"],
+            seed=seed, max_steps=space["max_steps"], Q=Q,
+            epsilon_decay=config["epsilon_decay"], min_epsilon=space["min_epsilon"],
+            start_episode=start_episode, checkpointer=checkpointer,
+        )
+    finally:
+        checkpointer.close()
+    train_seconds = time.perf_counter() - start
+
+    # every configuration is scored on the same evaluation episodes
+    greedy = compile_policy(Q)
+    random.seed(space["eval_seed"])
+    env.seed(random.getrandbits(64))
+    results = play_episodes(lambda env, state: greedy.action(state), env,
+                            space["eval_episodes"], space["max_steps"])
+    return {
+        "config": index,
+        "params": config,
+        "episodes": episodes,
+        "trained": episodes - start_episode,
+        "score": float(results["foods"].mean()),
+        "steps": float(results["steps"].mean()),
+        "reward": float(results["reward"].mean()),
+        "train_seconds": round(train_seconds, 3),
+    }
+
+
+def read_results(path):
+    """Finished (config, episodes) records of an earlier run, keyed by both."""
+    done = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    record = json.loads(line)
+                    done[record["config"], record["episodes"]] = record
+    return done
+
+
+def run_sweep(space, directory, workers=None, log=print):
+    """
+    Run (or resume) a successive-halving sweep described by `space`:
+    a dict with "grid" ({param: [values]} over PARAMS), "samples",
+    "min_episodes", "max_episodes", "eta", "grid_size", "state",
+    "max_steps", "min_epsilon", "eval_episodes" and "eval_seed".
+
+    returns: the best result record of the last rung
+    """
+    configs = search_space(space["grid"], space["samples"], space["seed"])
+    if not configs:
+        raise ValueError("The search space has no configurations to try")
+    if space["min_episodes"] < 1 or space["eta"] < 2:
+        raise ValueError("A sweep needs min_episodes >= 1 and eta >= 2")
+
+    os.makedirs(directory, exist_ok=True)
+    space_path = os.path.join(directory, SPACE_FILE)
+    if os.path.exists(space_path):
+        with open(space_path) as f:
+            saved = json.load(f)
+        if saved != space:
+            raise ValueError(f"{directory} holds a different sweep; use another directory")
+    else:
+        with open(space_path, "w") as f:
+            json.dump(space, f, indent=2)
+
+    seeds = worker_seeds(space["seed"], len(configs))
+    rungs = budgets(space["min_episodes"], space["max_episodes"], space["eta"])
+    results_path = os.path.join(directory, RESULTS_FILE)
+    done = read_results(results_path)
+    if done:
+        log(f"Resuming: {len(done)} results already in {results_path}")
+
+    alive = list(range(len(configs)))
+    pool = mp.Pool(workers or mp.cpu_count())
+    try:
+        with open(results_path, "a") as out:
+            for rung, episodes in enumerate(rungs):
+                todo = [(i, configs[i], episodes, space, directory, seeds[i])
+                        for i in alive if (i, episodes) not in done]
+                for record in pool.imap_unordered(_train_and_score, todo):
+                    done[record["config"], episodes] = record
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+
+                ranked = sorted(alive, key=lambda i: -done[i, episodes]["score"])
+                best = done[ranked[0], episodes]
+                log(f"Rung {rung}: {len(alive)} configs x {episodes:,} episodes, "
+                    f"best {best['score']:.2f} foods {best['params']}")
+                if rung + 1 < len(rungs):
+                    alive = ranked[:max(1, math.ceil(len(alive) / space["eta"]))]
+    finally:
+        pool.close()
+        pool.join()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sweep Q-learning hyperparameters with successive halving."
+    )
+    parser.add_argument("--alpha", type=float, nargs="+", default=[0.05, 0.1, 0.3])
+    parser.add_argument("--gamma", type=float, nargs="+", default=[0.8, 0.9, 0.99])
+    parser.add_argument("--epsilon", type=float, nargs="+", default=[0.05, 0.1, 0.3])
+    parser.add_argument("--epsilon-decay", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--samples", type=int, default=None,
+                        help="try this many random configurations instead of all")
+    parser.add_argument("--min-episodes", type=int, default=500,
+                        help="training episodes in the first rung")
+    parser.add_argument("--max-episodes", type=int, default=ql.num_episodes,
+                        help="training episodes for the last survivors")
+    parser.add_argument("--eta", type=int, default=3,
+                        help="keep the best 1/eta configurations per rung")
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--state", choices=["absolute", "relative"], default="absolute")
+    parser.add_argument("--max-steps", type=int, default=ql.max_steps_per_episode)
+    parser.add_argument("--min-epsilon", type=float, default=ql.min_epsilon)
+    parser.add_argument("--eval-episodes", type=int, default=500,
+                        help="greedy episodes used to score each configuration")
+    parser.add_argument("--workers", type=int, default=mp.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dir", default="sweep", help="sweep directory (resumed if it exists)")
+    parser.add_argument("--output", default=None,
+                        help="where to save the best Q-table (default: DIR/best.qtb)")
+    args = parser.parse_args()
+    if args.eta < 2:
+        parser.error("--eta must be at least 2")
+    if args.min_episodes < 1:
+        parser.error("--min-episodes must be at least 1")
+    if args.samples is not None and args.samples < 1:
+        parser.error("--samples must be at least 1")
+
+    space = {
+        "grid": {"alpha": args.alpha, "gamma": args.gamma, "epsilon": args.epsilon,
+                 "epsilon_decay": args.epsilon_decay},
+        "samples": args.samples,
+        "min_episodes": args.min_episodes,
+        "max_episodes": args.max_episodes,
+        "eta": args.eta,
+        "grid_size": args.grid_size,
+        "state": args.state,
+        "max_steps": args.max_steps,
+        "min_epsilon": args.min_epsilon,
+        "eval_episodes": args.eval_episodes,
+        "eval_seed": args.seed + 1,
+        "seed": args.seed,
+    }
+
+    start = time.perf_counter()
+    best = run_sweep(space, args.dir, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    Q, _, _ = load_checkpoint(os.path.join(args.dir, f"config-{best['config']}"))
+    output = args.output or os.path.join(args.dir, "best.qtb")
+    Q.save(output)
+
+    records = read_results(os.path.join(args.dir, RESULTS_FILE)).values()
+    trained = sum(r["trained"] for r in records)
+    configs = len(search_space(space["grid"], space["samples"], space["seed"]))
+    full = configs * args.max_episodes
+    print("\n=== SWEEP RESULT ===")
+    print(f"Best: {best['params']}")
+    print(f"Greedy foods {best['score']:.2f}, steps {best['steps']:.1f} "
+          f"after {best['episodes']:,} episodes")
+    print(f"Trained {trained:,} episodes in {elapsed:.1f}s; training all {configs} "
+          f"configs fully would take {full:,} ({trained / full:.0%})")
+    print(f"Best Q-table saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# terminal_renderer.py
+#
+# Incremental ANSI renderer for Snake boards in a terminal.
+#
+# The board is printed in full once, where the cursor is. After that only
+# the cells that changed are rewritten, by moving the cursor up into the
+# board with ANSI escape codes and back down again, so a game takes a fixed
+# block of lines instead of a new board per step.
+
+import os
+import sys
+import time
+
+EMPTY, BODY, HEAD, FOOD = ".", "o", "S", "F"
+
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+
+
+class TerminalRenderer:
+    """
+    Draws a SnakeBody and its food into the terminal.
+
+    The first draw() (and the first after invalidate()) prints the whole
+    board plus a status line. Later draws only send the cells that differ
+    from what is on screen, found from the change in the snake's occupied
+    cells, head and food, so a frame costs O(changes + snake length) and
+    not O(board).
+
+    fps caps the frame rate (0 = no cap) without the caller sleeping:
+      pace=True   draw() waits until the next frame is due, measured from
+                  the previous frame, so the caller's own work is absorbed
+                  instead of added to the delay; every frame is shown
+      pace=False  draw() returns at once and skips frames that come too
+                  early; the next drawn frame includes their changes
+
+    Boards wider or taller than the terminal are clipped to it; cells are
+    two characters wide when the board fits, one otherwise.
+    """
+
+    def __init__(self, cols, rows=None, fps=10, pace=True, out=None):
+        self.cols = cols
+        self.rows = rows or cols
+        self.frame_time = 1.0 / fps if fps else 0.0
+        self.pace = pace
+        self.out = out or sys.stdout
+        try:
+            size = os.get_terminal_size()
+        except OSError:   # not a terminal
+            size = os.terminal_size((80, 24))
+        self.columns = size.columns
+        self.cell_width = 2 if 2 * cols <= size.columns else 1
+        self.view_cols = min(cols, size.columns // self.cell_width)
+        self.view_rows = min(self.rows, max(1, size.lines - 2))
+        self.next_frame = 0.0
+        self.visible = False
+        self.invalidate()
+
+    def invalidate(self):
+        """Print the next frame as a new, full board (below the cursor)."""
+        self.screen = None      # chars on screen, one per visible cell
+        self.occupied = set()
+        self.head = None
+        self.food = None
+        self.status = None
+
+    def _char(self, cell, snake, food):
+        if cell == snake.head:
+            return HEAD
+        if cell in snake.occupied:
+            return BODY
+        if cell == food:
+            return FOOD
+        return EMPTY
+
+    def _full_board(self):
+        self.screen = bytearray(EMPTY.encode("ascii") * (self.view_cols * self.view_rows))
+        row = (EMPTY + " " * (self.cell_width - 1)) * self.view_cols
+        prefix = "" if self.visible else HIDE_CURSOR
+        self.visible = True
+        # board, then the status line; the cursor is left on the line below
+        return prefix + "\n".join([row.rstrip()] * self.view_rows) + "\n\n"
+
+    def draw(self, snake, food, status="", force=False):
+        """
+        Show the board for snake (a SnakeBody) and food (a cell or None).
+
+        force: draw even if pace=False would skip this frame (use it for
+               the last frame of a game)
+        returns: True if the frame was drawn
+        """
+        if self.frame_time:
+            now = time.monotonic()
+            if now < self.next_frame:
+                if self.pace:
+                    time.sleep(self.next_frame - now)
+                    now = self.next_frame
+                elif not force:
+                    return False
+            self.next_frame = now + self.frame_time
+
+        parts = []
+        if self.screen is None:
+            parts.append(self._full_board())
+
+        changed = self.occupied.symmetric_difference(snake.occupied)
+        changed.update((self.head, snake.head, self.food, food))
+        changed.discard(None)
+
+        # the cursor sits at column 1 of the line below the status line
+        width, screen = self.cell_width, self.screen
+        for cell in changed:
+            x, y = cell
+            if x >= self.view_cols or y >= self.view_rows:
+                continue
+            char = self._char(cell, snake, food)
+            i = y * self.view_cols + x
+            if screen[i] != ord(char):
+                screen[i] = ord(char)
+                up = self.view_rows + 1 - y
+                parts.append(f"\x1b[{up}A\x1b[{x * width + 1}G{char}\x1b[{up}B")
+
+        if status != self.status:
+            # a wrapped status line would shift every row of the board
+            parts.append(f"\x1b[1A\r\x1b[K{status[:self.columns - 1]}\n")
+            self.status = status
+        parts.append("\r")
+
+        self.occupied = set(snake.occupied)
+        self.head = snake.head
+        self.food = food
+        self.out.write("".join(parts))
+        self.out.flush()
+        return True
+
+    def input(self, prompt):
+        """input() below the board, erasing the prompt line afterwards."""
+        answer = input(prompt)
+        # a terminal echoes the Enter key, piped input doesn't
+        self.out.write("\x1b[1A\r\x1b[K" if sys.stdin.isatty() else "\r\x1b[K")
+        return answer
+
+    def close(self):
+        """Show the cursor again (the board stays on screen)."""
+        if self.visible:
+            self.out.write(SHOW_CURSOR)
+            self.out.flush()
+            self.visible = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,83 @@
+# tests/test_qtable.py
+
+import itertools
+
+import numpy as np
+import pytest
+
+from policy import GreedyPolicy, RelativeGreedyPolicy, compile_policy
+from qtable import QTable, RelativeQTable, BINARY_HEADER_SIZE
+
+
+def random_table(table_class=QTable, grid_size=4, seed=0):
+    # small integers, so that many rows have tied best actions
+    rng = np.random.default_rng(seed)
+    values = rng.integers(-2, 3, size=(table_class.count_states(grid_size), 4))
+    return table_class(grid_size, values=values.astype(np.float32))
+
+
+def test_binary_round_trip(tmp_path):
+    Q = random_table()
+    path = str(tmp_path / "q.qtb")
+    Q.save_binary(path)
+    loaded = QTable.open_binary(path)
+    assert isinstance(loaded.values, np.memmap)
+    assert loaded.grid_size == Q.grid_size
+    np.testing.assert_array_equal(loaded.values, Q.values)
+
+
+def test_binary_round_trip_relative(tmp_path):
+    Q = random_table(RelativeQTable, grid_size=0)
+    path = str(tmp_path / "q.qtb")
+    Q.save(path)
+    loaded = QTable.open_binary(path)
+    assert isinstance(loaded, RelativeQTable)
+    np.testing.assert_array_equal(loaded.values, Q.values)
+
+
+def test_open_binary_rejects_a_truncated_file(tmp_path):
+    path = tmp_path / "q.qtb"
+    random_table().save_binary(str(path))
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(ValueError, match="expected"):
+        QTable.open_binary(str(path))
+
+
+def test_open_binary_rejects_other_dtypes(tmp_path):
+    path = tmp_path / "q.qtb"
+    random_table().save_binary(str(path))
+    raw = bytearray(path.read_bytes())
+    dtype_at = raw.index(b"<f4", 0, BINARY_HEADER_SIZE)
+    raw[dtype_at:dtype_at + 3] = b"<f8"
+    path.write_bytes(bytes(raw))
+    with pytest.raises(ValueError, match="value type"):
+        QTable.open_binary(str(path))
+
+
+def test_non_contiguous_values_stay_live():
+    shape = (QTable.count_states(4), 4)
+    Q = QTable(4, values=np.asfortranarray(np.zeros(shape, dtype=np.float32)))
+    state = (1, 2, 3, 0)
+    Q[(state, "LEFT")] = 1.0
+    assert Q.best_action(state) == "LEFT"
+
+
+def test_greedy_policy_matches_best_action(tmp_path):
+    Q = random_table()
+    policy = compile_policy(Q)
+    path = str(tmp_path / "q.qpol")
+    policy.save(path)
+    loaded = GreedyPolicy.load(path)
+    for state in itertools.product(range(4), repeat=4):
+        assert policy.action(state) == Q.best_action(state)
+        assert loaded.action(state) == Q.best_action(state)
+
+
+def test_relative_policy_round_trip(tmp_path):
+    Q = random_table(RelativeQTable, grid_size=0)
+    path = str(tmp_path / "q.qpol")
+    compile_policy(Q).save(path)
+    loaded = GreedyPolicy.load(path)
+    assert isinstance(loaded, RelativeGreedyPolicy)
+    for state in range(Q.num_states):
+        assert loaded.action(state) == Q.best_action(state)
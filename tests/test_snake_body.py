@@ -0,0 +1,97 @@
+# tests/test_snake_body.py
+
+import random
+
+from snake_body import SnakeBody
+from snake_env import SnakeEnv
+
+
+def assert_consistent(snake):
+    """The grid, the occupied set and the segments all describe one snake."""
+    stride = snake.cols + 2
+    assert snake.occupied == set(snake.segments)
+    assert len(snake.occupied) == len(snake)
+    assert snake.num_free == snake.cols * snake.rows - len(snake)
+    for y in range(-1, snake.rows + 1):
+        for x in range(-1, snake.cols + 1):
+            on_board = 0 <= x < snake.cols and 0 <= y < snake.rows
+            expected = (x, y) in snake.occupied or not on_board
+            assert snake.grid[(y + 1) * stride + x + 1] == expected, (x, y)
+            assert snake.blocked(x, y) == expected
+
+
+def wander(snake, rng, moves):
+    """Move the snake at random (growing now and then) until it is stuck."""
+    for _ in range(moves):
+        head_x, head_y = snake.head
+        options = [(head_x + dx, head_y + dy) for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0))]
+        options = [cell for cell in options if not snake.blocked(*cell)]
+        if not options:
+            return
+        snake.push_head(rng.choice(options))
+        if rng.random() < 0.8:
+            snake.pop_tail()
+
+
+def test_grid_follows_the_snake():
+    snake = SnakeBody(7, 5, [(3, 2), (2, 2)])
+    assert_consistent(snake)
+    rng = random.Random(0)
+    for _ in range(50):
+        wander(snake, rng, 10)
+        assert_consistent(snake)
+
+
+def test_reset_restores_a_fresh_board():
+    snake = SnakeBody(8, 6, [(4, 3)])
+    wander(snake, random.Random(1), 500)
+    assert len(snake) > 1
+    grid = snake.grid
+
+    snake.reset([(1, 1), (1, 2)])
+    fresh = SnakeBody(8, 6, [(1, 1), (1, 2)])
+    assert snake.grid is grid
+    assert snake.grid == fresh.grid
+    assert list(snake) == list(fresh)
+    assert_consistent(snake)
+
+    snake.reset()
+    assert len(snake) == 0
+    assert snake.num_free == 8 * 6
+    assert_consistent(snake)
+
+
+def test_food_does_not_depend_on_history():
+    used = SnakeBody(6, 6, [(3, 3)])
+    wander(used, random.Random(2), 300)
+    used.reset([(3, 3)])
+    fresh = SnakeBody(6, 6, [(3, 3)])
+    a, b = random.Random(7), random.Random(7)
+    for _ in range(100):
+        assert used.random_free_cell(a) == fresh.random_free_cell(b)
+
+
+def test_random_free_cell_on_a_crowded_board():
+    cells = [(x, y) for y in range(4) for x in range(4)]
+    snake = SnakeBody(4, 4, cells[:14])
+    rng = random.Random(3)
+    drawn = {snake.random_free_cell(rng) for _ in range(200)}
+    assert drawn == {(2, 3), (3, 3)}
+
+    snake.push_tail((2, 3))
+    snake.push_tail((3, 3))
+    assert snake.random_free_cell(rng) is None
+
+
+def test_env_reuses_its_body_across_resets():
+    env = SnakeEnv(grid_size=6, seed=0)
+    snake, grid = env.snake, env.snake.grid
+    rng = random.Random(4)
+    for _ in range(20):
+        env.reset()
+        while not env.done:
+            env.step(rng.choice(["UP", "DOWN", "LEFT", "RIGHT"]))
+    env.reset()
+    assert env.snake is snake and env.snake.grid is grid
+    assert list(env.snake) == [(3, 3)]
+    assert_consistent(env.snake)
@@ -0,0 +1,65 @@
+# tests/test_training.py
+
+import os
+import random
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import q_learning_snake as ql
+from checkpoint import Checkpointer, load_checkpoint
+from qtable import QTable, qtable_for
+from snake_env import SnakeEnv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_foods_eaten_counts_every_food():
+    env = SnakeEnv(grid_size=4, seed=0)
+    Q = qtable_for(env)
+    random.seed(0)
+    total = 0
+    for _ in range(300):
+        _, _, foods = ql.run_episode(env, Q, 0.1, 0.9, 1.0, 200)
+        # the snake starts with one segment and grows by one per food
+        assert foods == len(env.snake) - 1
+        total += foods
+    assert total > 0
+
+
+def train_cli(directory, *args):
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "q_learning_snake.py"),
+         "--grid-size", "6", "--seed", "5", "--checkpoint-every", "40", *args],
+        cwd=directory, check=True, stdout=subprocess.DEVNULL,
+        env={**os.environ, "PYTHONPATH": ROOT},
+    )
+
+
+@pytest.mark.parametrize("extra", [[], ["--replay", "300", "--replay-every", "3"]])
+def test_resume_matches_an_uninterrupted_run(tmp_path, extra):
+    train_cli(tmp_path, *extra, "--episodes", "120", "--output", "full.qtb",
+              "--checkpoint-dir", "whole")
+    train_cli(tmp_path, *extra, "--episodes", "60", "--output", "first.qtb",
+              "--checkpoint-dir", "split")
+    train_cli(tmp_path, *extra, "--episodes", "120", "--output", "resumed.qtb",
+              "--checkpoint-dir", "split", "--resume")
+    assert (tmp_path / "resumed.qtb").read_bytes() == (tmp_path / "full.qtb").read_bytes()
+
+
+def test_checkpointer_keeps_the_newest_checkpoint(tmp_path):
+    Q = QTable(4)
+    checkpointer = Checkpointer(str(tmp_path), every=1)
+    for episode in range(1, 31):
+        Q.values[episode] = episode
+        checkpointer.save(Q, episode, {"episode": episode},
+                          arrays={"seen": np.arange(episode)})
+    checkpointer.close()
+
+    restored, episode, state = load_checkpoint(str(tmp_path))
+    assert episode == 30
+    assert state["episode"] == 30
+    np.testing.assert_array_equal(state["arrays"]["seen"], np.arange(30))
+    np.testing.assert_array_equal(restored.values, Q.values)
@@ -0,0 +1,50 @@
+# tests/test_trajectory.py
+
+import numpy as np
+
+from evaluation import evaluate
+from trajectory import TrajectoryStore, Replayer, pack_actions, unpack_actions
+
+
+def test_pack_round_trip():
+    rng = np.random.default_rng(0)
+    for steps in range(0, 13):
+        actions = rng.integers(0, 4, size=steps).astype(np.uint8)
+        np.testing.assert_array_equal(unpack_actions(pack_actions(actions), steps), actions)
+
+
+def test_recorded_episodes_replay_exactly(tmp_path):
+    store_dir = str(tmp_path / "runs")
+    for policy in ("random", "heuristic"):
+        evaluate(policy, 200, grid_size=6, workers=1, seed=3, max_steps=300,
+                 chunk_episodes=64, record=store_dir)
+
+    store = TrajectoryStore(store_dir)
+    assert len(store) == 400
+    # the heuristic fills much of a 6x6 board, so crowded food placement
+    # is replayed too
+    assert store.index["foods"].max() > 18
+    mismatches = [i for i in range(len(store)) if not Replayer(store, i).verify()]
+    assert mismatches == []
+
+
+def test_episodes_are_labelled_with_their_policy(tmp_path):
+    store_dir = str(tmp_path / "runs")
+    evaluate("random", 30, grid_size=5, workers=1, seed=1, record=store_dir)
+    evaluate("heuristic", 20, grid_size=5, workers=1, seed=1, record=store_dir)
+    evaluate("random", 10, grid_size=5, workers=1, seed=2, record=store_dir)
+
+    store = TrajectoryStore(store_dir)
+    assert store.policies == ["random", "heuristic"]
+    assert store.policy(0) == "random" and store.policy(30) == "heuristic"
+    assert len(store.select(policy="random")) == 40
+    assert list(store.select(policy="heuristic")) == list(range(30, 50))
+    assert len(store.select(policy="qtable")) == 0
+
+
+def test_recording_does_not_change_the_results(tmp_path):
+    plain = evaluate("random", 100, grid_size=6, workers=1, seed=5)
+    recorded = evaluate("random", 100, grid_size=6, workers=1, seed=5,
+                        record=str(tmp_path / "runs"))
+    assert plain["foods"] == recorded["foods"]
+    assert plain["steps"] == recorded["steps"]
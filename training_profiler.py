@@ -0,0 +1,103 @@
+# training_profiler.py
+
+import json
+import time
+
+import numpy as np
+
+PHASES = ("choose_action", "env_step", "reward_shaping", "q_update")
+
+
+class TrainingProfiler:
+    """
+    Per-phase timers and counters for the Q-learning training loop.
+
+    The loop calls record_step() once per step with the time spent in each
+    phase and end_episode() after every episode. Every `report_every` steps
+    a report dict is built and passed to `callback` and/or appended as one
+    JSON line to `jsonl_path`.
+
+    Report fields:
+        steps, episodes, elapsed  -- totals since the profiler was created
+        steps_per_sec             -- over the last reporting interval
+        phase_seconds             -- cumulative seconds per phase
+        q_entries                 -- non-zero (state, action) values in Q
+        unique_states             -- distinct states visited so far
+    """
+
+    def __init__(self, Q, report_every=10_000, callback=None, jsonl_path=None):
+        self.Q = Q
+        self.report_every = report_every
+        self.callback = callback
+        self.jsonl = open(jsonl_path, "a") if jsonl_path else None
+
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.steps = 0
+        self.episodes = 0
+        self.visited = np.zeros(Q.num_states, dtype=bool)
+        self.unique_states = 0
+
+        self.start = time.perf_counter()
+        self._last_time = self.start
+        self._last_steps = 0
+
+    def record_step(self, state, choose_action, env_step, reward_shaping, q_update):
+        """Add one step's phase durations (seconds) and mark state visited."""
+        seconds = self.phase_seconds
+        seconds["choose_action"] += choose_action
+        seconds["env_step"] += env_step
+        seconds["reward_shaping"] += reward_shaping
+        seconds["q_update"] += q_update
+
+        s = self.Q.encode(state)
+        if not self.visited[s]:
+            self.visited[s] = True
+            self.unique_states += 1
+
+        self.steps += 1
+        if self.steps % self.report_every == 0:
+            self.report()
+
+    def end_episode(self):
+        self.episodes += 1
+
+    def report(self):
+        """Build a report, send it to the callback / JSONL file and return it."""
+        now = time.perf_counter()
+        interval = now - self._last_time
+        report = {
+            "steps": self.steps,
+            "episodes": self.episodes,
+            "elapsed": now - self.start,
+            "steps_per_sec": (self.steps - self._last_steps) / interval if interval else 0.0,
+            "phase_seconds": dict(self.phase_seconds),
+            "q_entries": int(np.count_nonzero(self.Q.values)),
+            "unique_states": self.unique_states,
+        }
+        self._last_time = now
+        self._last_steps = self.steps
+
+        if self.callback is not None:
+            self.callback(report)
+        if self.jsonl is not None:
+            self.jsonl.write(json.dumps(report) + "\n")
+            self.jsonl.flush()
+        return report
+
+    def close(self):
+        """Send a final report and close the JSONL file."""
+        report = self.report()
+        if self.jsonl is not None:
+            self.jsonl.close()
+            self.jsonl = None
+        return report
+
+
+def print_report(report):
+    """Callback that prints a one-line summary of a report."""
+    total = sum(report["phase_seconds"].values()) or 1.0
+    shares = "  ".join(f"{phase} {seconds / total:.0%}"
+                       for phase, seconds in report["phase_seconds"].items())
+    print(f"[profile] steps={report['steps']} episodes={report['episodes']} "
+          f"{report['steps_per_sec']:,.0f} steps/s  {shares}  "
+          f"q_entries={report['q_entries']} states={report['unique_states']}")
@@ -0,0 +1,367 @@
+# trajectory.py
+#
+# Recorded episodes, stored as the episode seed plus the actions taken,
+# 2 bits per action.
+#
+# A trajectory store is a directory with append-only files:
+#   actions.bin   packed action streams, 4 actions per byte (ACTIONS order,
+#                 first action in the lowest bits), one episode after another
+#   index.bin     64-byte header, then one fixed-size record per episode
+#                 (INDEX_DTYPE): episode seed, offset in actions.bin, steps,
+#                 foods, reward, grid size, outcome and policy
+#   policies.txt  the policy labels, one per line; a record's policy k > 0
+#                 is line k (0 = not labelled)
+# SnakeEnv.reset(seed=...) places the food exactly as in the original
+# episode, so the seed and the actions rebuild every state of it. Both files
+# are memory-mapped for reading, so a store with millions of episodes opens
+# instantly and can be searched by score or length with NumPy.
+
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+
+from snake_env import SnakeEnv, ACTIONS
+from terminal_renderer import TerminalRenderer
+
+INDEX_FILE = "index.bin"
+ACTIONS_FILE = "actions.bin"
+POLICIES_FILE = "policies.txt"
+MAX_POLICIES = 255
+
+TRAJECTORY_MAGIC = b"SNAKETR\0"
+TRAJECTORY_VERSION = 1
+TRAJECTORY_HEADER = struct.Struct("<8sHHI")   # magic, version, header size, record size
+TRAJECTORY_HEADER_SIZE = 64
+
+INDEX_DTYPE = np.dtype([
+    ("seed", "<u8"),
+    ("offset", "<u8"),        # byte offset of the actions in actions.bin
+    ("steps", "<u4"),
+    ("foods", "<u4"),
+    ("reward", "<f4"),
+    ("grid_size", "<u2"),
+    ("outcome", "u1"),        # index into OUTCOMES
+    ("policy", "u1"),         # line in policies.txt, 0 if not labelled
+])
+OUTCOMES = ("timeout", "died", "won")
+
+
+def pack_actions(actions):
+    """Pack a sequence of action indices (0-3) into bytes, 4 per byte."""
+    a = np.frombuffer(bytes(actions), dtype=np.uint8)
+    padded = np.zeros(-(-len(a) // 4) * 4, dtype=np.uint8)
+    padded[:len(a)] = a
+    return (padded[0::4] | padded[1::4] << 2 | padded[2::4] << 4 | padded[3::4] << 6).tobytes()
+
+
+def unpack_actions(packed, steps):
+    """Inverse of pack_actions(): uint8 array of `steps` action indices."""
+    b = np.frombuffer(packed, dtype=np.uint8)
+    return (b[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8) & 3).ravel()[:steps]
+
+
+def outcome_of(env):
+    """OUTCOMES index for an env after its last step."""
+    if env.won:
+        return 2
+    return 1 if env.done else 0
+
+
+def read_policies(directory):
+    """The store's policy labels; labels[k - 1] belongs to policy k."""
+    path = os.path.join(directory, POLICIES_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def _read_header(path):
+    with open(path, "rb") as f:
+        raw = f.read(TRAJECTORY_HEADER_SIZE)
+    if len(raw) < TRAJECTORY_HEADER_SIZE or not raw.startswith(TRAJECTORY_MAGIC):
+        raise ValueError(f"{path} is not a trajectory index")
+    _, version, header_size, record_size = TRAJECTORY_HEADER.unpack_from(raw)
+    if version != TRAJECTORY_VERSION or record_size != INDEX_DTYPE.itemsize:
+        raise ValueError(f"{path}: unsupported trajectory format (version {version})")
+    return header_size
+
+
+class TrajectoryWriter:
+    """
+    Appends episodes to a trajectory store (created if missing).
+
+    Index records are buffered and written every `flush_every` episodes,
+    always after the action bytes they point to, so a store that was not
+    closed cleanly only loses its last unflushed episodes.
+
+    policy: label stored with every episode this writer appends (e.g. the
+            evaluation policy spec), so runs of several policies can share
+            a store; None leaves them unlabelled
+    """
+
+    def __init__(self, directory, flush_every=1000, policy=None):
+        os.makedirs(directory, exist_ok=True)
+        self.flush_every = flush_every
+        self.policy = self._policy_id(directory, policy)
+        index_path = os.path.join(directory, INDEX_FILE)
+        actions_path = os.path.join(directory, ACTIONS_FILE)
+
+        if os.path.exists(index_path) and os.path.getsize(index_path) > 0:
+            header_size = _read_header(index_path)
+            # drop a partial last record and any actions it doesn't cover
+            count = (os.path.getsize(index_path) - header_size) // INDEX_DTYPE.itemsize
+            end = 0
+            if count:
+                with open(index_path, "rb") as f:
+                    f.seek(header_size + (count - 1) * INDEX_DTYPE.itemsize)
+                    last = np.frombuffer(f.read(INDEX_DTYPE.itemsize), dtype=INDEX_DTYPE)[0]
+                end = int(last["offset"]) + -(-int(last["steps"]) // 4)
+            self.index = open(index_path, "r+b")
+            self.index.truncate(header_size + count * INDEX_DTYPE.itemsize)
+            self.index.seek(0, os.SEEK_END)
+        else:
+            count, end = 0, 0
+            self.index = open(index_path, "wb")
+            header = TRAJECTORY_HEADER.pack(TRAJECTORY_MAGIC, TRAJECTORY_VERSION,
+                                            TRAJECTORY_HEADER_SIZE, INDEX_DTYPE.itemsize)
+            self.index.write(header.ljust(TRAJECTORY_HEADER_SIZE, b"\0"))
+
+        self.actions = open(actions_path, "r+b" if os.path.exists(actions_path) else "wb")
+        self.actions.truncate(end)
+        self.actions.seek(end)
+        self.episodes = count
+        self.offset = end
+        self.records = np.zeros(flush_every, dtype=INDEX_DTYPE)
+        self.pending = 0
+
+    def append(self, seed, grid_size, actions, foods, reward, outcome):
+        """
+        Record one episode.
+
+        actions: action indices (bytes, bytearray or uint8 array)
+        outcome: index into OUTCOMES (see outcome_of())
+        returns: the episode's number in the store
+        """
+        return self.append_packed(seed, grid_size, pack_actions(actions), len(actions),
+                                  foods, reward, outcome)
+
+    def append_packed(self, seed, grid_size, packed, steps, foods, reward, outcome):
+        """append() for actions already packed with pack_actions()."""
+        self.actions.write(packed)
+        self.records[self.pending] = (seed, self.offset, steps, foods, reward,
+                                      grid_size, outcome, self.policy)
+        self.offset += len(packed)
+        self.pending += 1
+        self.episodes += 1
+        if self.pending == self.flush_every:
+            self.flush()
+        return self.episodes - 1
+
+    @staticmethod
+    def _policy_id(directory, policy):
+        """policy's number in the store, adding it to policies.txt if new."""
+        if policy is None:
+            return 0
+        if "\n" in policy or "\r" in policy:
+            raise ValueError(f"Policy label {policy!r} spans several lines")
+        labels = read_policies(directory)
+        if policy in labels:
+            return labels.index(policy) + 1
+        if len(labels) == MAX_POLICIES:
+            raise ValueError(f"{directory} already holds {MAX_POLICIES} policies")
+        with open(os.path.join(directory, POLICIES_FILE), "a", encoding="utf-8") as f:
+            f.write(policy + "\n")
+        return len(labels) + 1
+
+    def flush(self):
+        self.actions.flush()
+        os.fsync(self.actions.fileno())
+        self.index.write(self.records[:self.pending].tobytes())
+        self.index.flush()
+        self.pending = 0
+
+    def close(self):
+        if self.index is not None:
+            self.flush()
+            self.index.close()
+            self.actions.close()
+            self.index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryStore:
+    """
+    Read-only view of a trajectory store.
+
+    `index` is a structured array (INDEX_DTYPE) memory-mapped from
+    index.bin, so columns like index["foods"] can be sorted and filtered
+    without reading any actions.
+    """
+
+    def __init__(self, directory):
+        index_path = os.path.join(directory, INDEX_FILE)
+        header_size = _read_header(index_path)
+        count = (os.path.getsize(index_path) - header_size) // INDEX_DTYPE.itemsize
+        # np.memmap can't map an empty file
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        if count:
+            self.index = np.memmap(index_path, dtype=INDEX_DTYPE, mode="r",
+                                   offset=header_size, shape=(count,))
+        actions_path = os.path.join(directory, ACTIONS_FILE)
+        self.packed = np.zeros(0, dtype=np.uint8)
+        if os.path.getsize(actions_path):
+            self.packed = np.memmap(actions_path, dtype=np.uint8, mode="r")
+        self.policies = read_policies(directory)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, episode):
+        return self.index[episode]
+
+    def policy(self, episode):
+        """The episode's policy label, or None if it was not labelled."""
+        k = int(self.index[episode]["policy"])
+        return self.policies[k - 1] if k else None
+
+    def actions(self, episode):
+        """The episode's action indices as a uint8 array."""
+        record = self.index[episode]
+        start, steps = int(record["offset"]), int(record["steps"])
+        return unpack_actions(self.packed[start:start + -(-steps // 4)], steps)
+
+    def ranked(self, by="foods", limit=None):
+        """Episode numbers sorted by a column ("foods", "steps", "reward"), best first."""
+        column = np.asarray(self.index[by], dtype=np.float64)
+        if limit is not None and limit < len(column):
+            top = np.argpartition(-column, limit - 1)[:limit]
+            return top[np.argsort(-column[top], kind="stable")]
+        return np.argsort(-column, kind="stable")
+
+    def select(self, min_foods=0, min_steps=0, outcome=None, policy=None):
+        """
+        Episode numbers with at least min_foods / min_steps (and that
+        outcome, and played by that policy label).
+        """
+        mask = (self.index["foods"] >= min_foods) & (self.index["steps"] >= min_steps)
+        if outcome is not None:
+            mask &= self.index["outcome"] == OUTCOMES.index(outcome)
+        if policy is not None:
+            if policy not in self.policies:
+                return np.zeros(0, dtype=np.intp)
+            mask &= self.index["policy"] == self.policies.index(policy) + 1
+        return np.flatnonzero(mask)
+
+
+class Replayer:
+    """
+    Rebuilds a recorded episode step by step in a SnakeEnv.
+
+    seek(k) fast-forwards to the state after k actions without rendering
+    anything (rewinding first if k is behind the current step).
+    """
+
+    def __init__(self, store, episode):
+        record = store[episode]
+        self.record = record
+        self.seed = int(record["seed"])
+        self.moves = store.actions(episode)
+        self.env = SnakeEnv(grid_size=int(record["grid_size"]))
+        self.rewind()
+
+    def __len__(self):
+        return len(self.moves)
+
+    def rewind(self):
+        self.env.reset(seed=self.seed)
+        self.position = 0
+        self.foods = 0
+        self.reward = 0
+
+    def step(self):
+        """Apply the next recorded action; returns (state, reward, done)."""
+        action = ACTIONS[self.moves[self.position]]
+        state, reward, done = self.env.step(action)
+        self.position += 1
+        self.reward += reward
+        if reward >= 1:
+            self.foods += 1
+        return state, reward, done
+
+    def seek(self, k):
+        k = max(0, min(k, len(self.moves)))
+        if k < self.position:
+            self.rewind()
+        while self.position < k:
+            self.step()
+
+    @property
+    def finished(self):
+        return self.position == len(self.moves)
+
+    def verify(self):
+        """Replay to the end and check the result matches the record."""
+        self.seek(len(self.moves))
+        return (self.foods == int(self.record["foods"])
+                and outcome_of(self.env) == int(self.record["outcome"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and replay recorded episodes.")
+    parser.add_argument("store", help="trajectory store directory")
+    parser.add_argument("--top", type=int, default=10, help="list the N best episodes")
+    parser.add_argument("--by", choices=["foods", "steps", "reward"], default="foods")
+    parser.add_argument("--episode", type=int, default=None, help="replay this episode")
+    parser.add_argument("--step", type=int, default=0, help="start the replay at this step")
+    parser.add_argument("--fps", type=float, default=10, help="replay frames per second")
+    parser.add_argument("--verify", action="store_true",
+                        help="replay every episode and check it matches its record")
+    args = parser.parse_args()
+
+    store = TrajectoryStore(args.store)
+    if args.verify:
+        start = time.perf_counter()
+        bad = [i for i in range(len(store)) if not Replayer(store, i).verify()]
+        elapsed = time.perf_counter() - start
+        steps = int(store.index["steps"].sum())
+        print(f"Replayed {len(store):,} episodes ({steps:,} steps) in {elapsed:.1f}s: "
+              f"{len(bad)} mismatches")
+        return
+
+    if args.episode is None:
+        size = os.path.getsize(os.path.join(args.store, ACTIONS_FILE))
+        print(f"{len(store):,} episodes, {int(store.index['steps'].sum()):,} steps "
+              f"({size / 1024:,.0f} KB of actions)")
+        print(f"Top {args.top} by {args.by}:")
+        for i in store.ranked(args.by, args.top):
+            r = store[i]
+            print(f"  #{i:<8} foods {r['foods']:<4} steps {r['steps']:<6} "
+                  f"reward {r['reward']:<6.1f} {OUTCOMES[r['outcome']]} "
+                  f"({r['grid_size']}x{r['grid_size']}) {store.policy(i) or ''}")
+        return
+
+    replay = Replayer(store, args.episode)
+    replay.seek(args.step)
+    env = replay.env
+    with TerminalRenderer(env.grid_size, fps=args.fps) as renderer:
+        while True:
+            renderer.draw(env.snake, env.food,
+                          f"Step {replay.position}/{len(replay)}  foods {replay.foods}")
+            if replay.finished:
+                break
+            replay.step()
+    print(f"Episode {args.episode}: {replay.foods} foods, "
+          f"{OUTCOMES[replay.record['outcome']]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# value_iteration.py
+
+import argparse
+import time
+
+import numpy as np
+
+from snake_env import SnakeEnv, ACTIONS
+from qtable import QTable, QTABLE_FILE
+import q_learning_snake as ql
+
+# (dx, dy) for each action, in ACTIONS order
+DELTAS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+SHAPING = 0.1   # same reward shaping as q_learning_snake.run_episode
+
+
+def _head_slices(g, dx, dy):
+    """
+    Slices (heads, next_heads) over the head axes such that next_heads is
+    heads moved by (dx, dy), for every head that stays on the board.
+    """
+    heads = (slice(max(0, -dx), g - max(0, dx)), slice(max(0, -dy), g - max(0, dy)))
+    next_heads = (slice(max(0, dx), g - max(0, -dx)), slice(max(0, dy), g - max(0, -dy)))
+    return heads, next_heads
+
+
+class SnakeModel:
+    """
+    The known MDP of a one-segment snake on a grid_size board.
+
+    States are (head_x, head_y, food_x, food_y), laid out like QTable rows.
+    Per action:
+      - leaving the board ends the episode with reward -1
+      - moving onto the food gives +1, and new food appears uniformly on any
+        other cell (reward shaping is applied against the new food)
+      - any other move gives +0.1 if it gets closer to the food, else -0.1
+
+    The body is ignored, as in the state tuple itself: the snake is treated
+    as a single segment even after eating.
+
+    All reward tensors are built once here; each sweep of value_iteration()
+    only combines shifted array slices.
+    """
+
+    def __init__(self, grid_size):
+        g = self.grid_size = grid_size
+        self.num_cells = g * g
+        hx = np.arange(g).reshape(g, 1, 1, 1)
+        hy = np.arange(g).reshape(1, g, 1, 1)
+        fx = np.arange(g).reshape(1, 1, g, 1)
+        fy = np.arange(g).reshape(1, 1, 1, g)
+
+        # reward for a normal move, per action, indexed by the current state
+        self.move_rewards = []
+        for dx, dy in DELTAS:
+            closer = (dx * (fx - hx) > 0) | (dy * (fy - hy) > 0)
+            reward = np.where(closer, SHAPING, -SHAPING).astype(np.float32)
+            self.move_rewards.append(np.broadcast_to(reward, (g, g, g, g)))
+
+        # expected shaping after eating, indexed by the new head: the distance
+        # before is 1, so any new food further than 1 away costs -0.1
+        cx = np.arange(g).reshape(g, 1, 1, 1)
+        cy = np.arange(g).reshape(1, g, 1, 1)
+        dist = np.abs(cx - fx) + np.abs(cy - fy)
+        farther = (dist > 1).reshape(g, g, -1).sum(axis=2)
+        self.eat_rewards = (1.0 - SHAPING * farther / (self.num_cells - 1)).astype(np.float32)
+
+        # states where action a eats: the food is the cell next to the head
+        self.eat_index = []
+        for dx, dy in DELTAS:
+            hxs, hys = np.meshgrid(np.arange(g), np.arange(g), indexing="ij")
+            nx, ny = hxs + dx, hys + dy
+            ok = (nx >= 0) & (nx < g) & (ny >= 0) & (ny < g)
+            self.eat_index.append((hxs[ok], hys[ok], nx[ok], ny[ok]))
+
+    def q_values(self, V, gamma):
+        """Q[a, hx, hy, fx, fy] for the value function V[hx, hy, fx, fy]."""
+        g = self.grid_size
+        flat = V.reshape(g, g, -1)
+        diagonal = V.reshape(self.num_cells, self.num_cells).diagonal().reshape(g, g)
+        # expected value after eating, by new head: mean over all other food cells
+        after_eat = (flat.sum(axis=2) - diagonal) / (self.num_cells - 1)
+
+        Q = np.empty((len(ACTIONS),) + V.shape, dtype=np.float32)
+        for a, (dx, dy) in enumerate(DELTAS):
+            q = Q[a]
+            # off the board: terminal, value 0 afterwards
+            q[...] = -1.0
+            heads, next_heads = _head_slices(g, dx, dy)
+            q[heads] = self.move_rewards[a][heads] + gamma * V[next_heads]
+
+            hxs, hys, nx, ny = self.eat_index[a]
+            q[hxs, hys, nx, ny] = self.eat_rewards[nx, ny] + gamma * after_eat[nx, ny]
+        return Q
+
+
+def value_iteration(grid_size, gamma=ql.gamma, tol=1e-6, max_iterations=10_000):
+    """
+    Solve the one-segment snake MDP exactly.
+
+    returns: (Q, iterations) where Q is a QTable with the optimal values
+    """
+    model = SnakeModel(grid_size)
+    g = grid_size
+    V = np.zeros((g, g, g, g), dtype=np.float32)
+    for iteration in range(1, max_iterations + 1):
+        Q = model.q_values(V, gamma)
+        V_new = Q.max(axis=0)
+        delta = float(np.abs(V_new - V).max())
+        V = V_new
+        if delta < tol:
+            break
+    Q = model.q_values(V, gamma)
+    values = np.ascontiguousarray(Q.reshape(len(ACTIONS), -1).T)
+    return QTable(grid_size, values=values), iteration
+
+
+def greedy_foods(Q, episodes, max_steps=ql.max_steps_per_episode, grid_size=None):
+    """
+    Average foods eaten by the greedy policy of Q.
+
+    grid_size defaults to the table's own; a relative-state table can be
+    played on any board.
+    """
+    env = SnakeEnv(grid_size=grid_size or Q.grid_size, state_encoding=Q.state_encoding)
+    foods = 0
+    for _ in range(episodes):
+        state = env.reset()
+        for _ in range(max_steps):
+            state, reward, done = env.step(Q.best_action(state))
+            foods += reward == 1
+            if done:
+                break
+    return foods / episodes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute the optimal Q-table of the one-segment snake with value iteration."
+    )
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--gamma", type=float, default=ql.gamma)
+    parser.add_argument("--tol", type=float, default=1e-6, help="stop when max |dV| < tol")
+    parser.add_argument("--output", default=QTABLE_FILE)
+    parser.add_argument("--compare-episodes", type=int, default=0, metavar="N",
+                        help="also train Q-learning for N episodes and compare")
+    parser.add_argument("--eval-episodes", type=int, default=200,
+                        help="greedy games used to score each Q-table")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    Q, iterations = value_iteration(args.grid_size, gamma=args.gamma, tol=args.tol)
+    elapsed = time.perf_counter() - start
+    Q.save(args.output)
+
+    print(f"=== VALUE ITERATION ({args.grid_size}x{args.grid_size}, "
+          f"{Q.num_states:,} states) ===")
+    print(f"Converged in {iterations} iterations, {elapsed:.2f}s")
+    print(f"Greedy foods per game: {greedy_foods(Q, args.eval_episodes):.2f}")
+    print(f"Q-table saved to {args.output}")
+
+    if args.compare_episodes:
+        env = SnakeEnv(grid_size=args.grid_size)
+        start = time.perf_counter()
+        trained, _ = ql.train(env, args.compare_episodes, ql.alpha, args.gamma, ql.epsilon, seed=0)
+        elapsed = time.perf_counter() - start
+        print(f"\n=== Q-LEARNING ({args.compare_episodes} episodes) ===")
+        print(f"Trained in {elapsed:.2f}s")
+        print(f"Greedy foods per game: {greedy_foods(trained, args.eval_episodes):.2f}")
+
+
+if __name__ == "__main__":
+    main()
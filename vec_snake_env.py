@@ -0,0 +1,155 @@
+# vec_snake_env.py
+
+import numpy as np
+from snake_env import ACTIONS
+
+# (dx, dy) for each action index, in the same order as ACTIONS
+ACTION_DELTAS = np.array([[0, -1], [0, 1], [-1, 0], [1, 0]], dtype=np.int32)
+
+
+class VecSnakeEnv:
+    """
+    Run many SnakeEnv games at once with NumPy arrays.
+
+    Every game follows the same rules as SnakeEnv: the snake starts in the
+    middle, grows by one segment when it eats, and the episode ends when it
+    hits a wall or its own body (the tail counts, just like in SnakeEnv),
+    or wins by filling the whole board.
+    Finished games are reset automatically inside step().
+
+    Actions are integer indices into ACTIONS (0=UP, 1=DOWN, 2=LEFT, 3=RIGHT).
+    States are rows of (head_x, head_y, food_x, food_y).
+    """
+
+    def __init__(self, num_envs, grid_size=10, seed=None):
+        self.num_envs = num_envs
+        self.grid_size = grid_size
+        self.num_cells = grid_size * grid_size
+        self.rng = np.random.default_rng(seed)
+
+        n, c = num_envs, self.num_cells
+        self.heads = np.zeros((n, 2), dtype=np.int32)
+        self.food = np.zeros((n, 2), dtype=np.int32)
+        self.occupied = np.zeros((n, c), dtype=bool)
+
+        # body[i] is a ring buffer of cell indices, oldest (tail) first
+        self.body = np.zeros((n, c), dtype=np.int32)
+        self.tail_ptr = np.zeros(n, dtype=np.int64)
+        self.lengths = np.zeros(n, dtype=np.int64)
+
+        # states of the games that just finished, before they were reset
+        self.final_states = np.zeros((n, 4), dtype=np.int32)
+
+        self._rows = np.arange(n)
+        self.reset()
+
+    def reset(self):
+        """Start a new episode in every game and return all states."""
+        self._reset_games(self._rows)
+        return self.get_states()
+
+    def _reset_games(self, idx):
+        """Put the snake back in the middle and spawn food for games idx."""
+        if idx.size == 0:
+            return
+        mid = self.grid_size // 2
+        start = mid * self.grid_size + mid
+
+        self.occupied[idx] = False
+        self.occupied[idx, start] = True
+        self.body[idx, 0] = start
+        self.tail_ptr[idx] = 0
+        self.lengths[idx] = 1
+        self.heads[idx] = mid
+        self._spawn_food(idx)
+
+    def _spawn_food(self, idx):
+        """
+        Place food on a uniformly random empty cell for games idx.
+
+        Returns a boolean mask over idx that is True where the board was
+        already full (no empty cell left, i.e. the snake has won).
+        """
+        free = ~self.occupied[idx]
+        full = ~free.any(axis=1)
+
+        # random key per cell, occupied cells can never win the argmax
+        keys = self.rng.random(free.shape)
+        keys[~free] = -1.0
+        cells = keys.argmax(axis=1)
+
+        self.food[idx, 0] = cells % self.grid_size
+        self.food[idx, 1] = cells // self.grid_size
+        # no room for food: leave it on the head so the state stays valid
+        if full.any():
+            self.food[idx[full]] = self.heads[idx[full]]
+        return full
+
+    def get_states(self):
+        """Return an (N, 4) array of (head_x, head_y, food_x, food_y)."""
+        return np.concatenate([self.heads, self.food], axis=1)
+
+    def step(self, actions):
+        """
+        Take one step in every game.
+
+        actions: int array of shape (N,) with values in range(len(ACTIONS))
+
+        returns: (states, rewards, dones)
+            states  -- (N, 4) int32, already reset where dones is True
+            rewards -- (N,) float32, -1 crash, +1 food, 0 otherwise
+            dones   -- (N,) bool
+
+        The state each finished game ended in is kept in self.final_states.
+        """
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(
+                f"Expected actions of shape ({self.num_envs},), got {actions.shape}"
+            )
+        if actions.size and (actions.min() < 0 or actions.max() >= len(ACTIONS)):
+            raise ValueError(f"Unknown action in {actions}")
+
+        g, c = self.grid_size, self.num_cells
+        rows = self._rows
+
+        new_heads = self.heads + ACTION_DELTAS[actions]
+        nx, ny = new_heads[:, 0], new_heads[:, 1]
+        out = (nx < 0) | (nx >= g) | (ny < 0) | (ny >= g)
+        cells = np.where(out, 0, ny * g + nx)
+
+        # like SnakeEnv, the tail is checked before it moves away
+        crashed = out | self.occupied[rows, cells]
+        moved = rows[~crashed]
+        new_cells = cells[moved]
+
+        food_cells = self.food[:, 1] * g + self.food[:, 0]
+        ate = np.zeros(self.num_envs, dtype=bool)
+        ate[moved] = new_cells == food_cells[moved]
+
+        # push the new head for every game that survived
+        head_ptr = (self.tail_ptr[moved] + self.lengths[moved]) % c
+        self.body[moved, head_ptr] = new_cells
+        self.occupied[moved, new_cells] = True
+        self.lengths[moved] += 1
+        self.heads[moved] = new_heads[moved]
+
+        # pop the tail where nothing was eaten
+        shrink = moved[~ate[moved]]
+        tails = self.body[shrink, self.tail_ptr[shrink]]
+        self.occupied[shrink, tails] = False
+        self.tail_ptr[shrink] = (self.tail_ptr[shrink] + 1) % c
+        self.lengths[shrink] -= 1
+
+        won = np.zeros(self.num_envs, dtype=bool)
+        eaters = rows[ate]
+        won[eaters] = self._spawn_food(eaters)
+
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        rewards[crashed] = -1.0
+        rewards[ate] = 1.0
+        dones = crashed | won
+
+        self.final_states[:] = self.get_states()
+        self._reset_games(rows[dones])
+        return self.get_states(), rewards, dones